@@ -4,12 +4,19 @@ import sys
 import re
 import subprocess
 import shutil
-import json
 import argparse
+import contextlib
+import functools
+import io
+import mmap
+import operator
 from dateutil.parser import parse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
 import emoji
 
+from json_utils import background_json_writes, write_json_file
+
 # Import LLM processing functionality from modular structure
 from llm_processor import (
     set_privacy_enabled, 
@@ -18,6 +25,8 @@ from llm_processor import (
     generate_conversation_metadata,
     reset_person_mapping,
     process_contact_for_llm_files,
+    get_llm_contact_data,
+    prepare_llm_content,
     ANONYMIZE_LLM_DATA,
     RECENT_INTERACTIONS_FILENAME
 )
@@ -34,66 +43,208 @@ MIN_MESSAGE_COUNT = 10  # Only export contacts with this many messages or more
 # Message file configuration
 CREATE_INDIVIDUAL_MESSAGE_FILES = False  # Set to True if you need individual files for debugging
 CREATE_CONSOLIDATED_MESSAGE_FILES = True  # Always create the unified timeline
+MESSAGE_PARSE_CACHE_SIZE = 64  # Parsed message files kept in memory for reuse
+PHONE_NUMBER_CACHE_SIZE = 8192  # Normalized phone numbers remembered (vCard TELs and group chat senders)
+TIMESTAMP_CACHE_SIZE = 65536  # Parsed timestamp strings remembered (each file's are parsed more than once)
+LINE_COUNT_CHUNK_SIZE = 1 << 20  # Bytes copied at a time when counting lines in files without timestamps
 
-# Enhanced username patterns to catch directly mentioned usernames
-USERNAME_CONTEXT_PATTERNS = [
-    r'github\s+username\s+is\s+([A-Za-z0-9_-]{3,})',        # GitHub username is X
-    r'gh\s+username\s+is\s+([A-Za-z0-9_-]{3,})',            # gh username is X
-    r'github\s+user\s+is\s+([A-Za-z0-9_-]{3,})',            # GitHub user is X
-    r'twitter\s+handle\s+is\s+@?([A-Za-z0-9_]{3,})',        # Twitter handle is X
-    r'instagram\s+(?:is|username)\s+@?([A-Za-z0-9_\.]{3,})', # Instagram is X or username is X
-    r'ig\s+(?:is|username)\s+@?([A-Za-z0-9_\.]{3,})',        # ig is X or username is X 
-    r'linkedin\s+(?:is|profile)\s+([A-Za-z0-9_-]{3,})',      # LinkedIn is X or profile is X
-    r'facebook\s+(?:is|username)\s+([A-Za-z0-9\.]{3,})',     # Facebook is X or username is X
-    r'discord\s+(?:is|tag)\s+([A-Za-z0-9_#\.]{3,})',         # Discord is X or tag is X
-    r'telegram\s+(?:is|username)\s+@?([A-Za-z0-9_]{3,})',    # Telegram is X or username is X
-    r'my\s+username\s+(?:is|:)\s+([A-Za-z0-9_\.-]{3,})',      # My username is X
-    r'username\s+(?:is|:)\s+([A-Za-z0-9_\.-]{3,})',           # Username is X (general)
-    r'my\s+github\s+username\s+is\s+([A-Za-z0-9_-]{3,})',     # My GitHub username is X
-    r'my\s+twitter\s+(?:handle|username)\s+is\s+@?([A-Za-z0-9_]{3,})'  # My Twitter handle/username is X
-]
+# Parallel processing configuration
+PARALLEL_WORKERS = os.cpu_count() or 1  # Worker processes used to parse message files
+CONTACT_BATCH_SIZE = 16  # Contacts whose message files are parsed together in parallel
+JSON_WRITER_THREADS = 8  # Threads writing per-contact JSON files while the next contact is processed
+
+# Timestamp formats used to count messages, fused into one alternation so each
+# file is scanned once. Each format keeps its own group so matches can still be
+# tallied per format (the count is the best-matching format, not the sum).
+# Bytes pattern so message files can be scanned in raw chunks without decoding.
+TIMESTAMP_COUNT_PATTERN = re.compile(
+    rb'(\b\w{3}\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M\b)'   # Jan 15, 2025  2:30:15 PM
+    rb'|(\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)'       # 1/15/25 2:30:15 PM
+    rb'|(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})'                       # 2025-01-15 14:30:15
+)
 
-# Password detection patterns (look for context followed by potential password)
-PASSWORD_PATTERNS = [
-    r'password\s+(?:is|:)\s+([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',  # "password is X" or "password: X"
-    r'pwd\s+(?:is|:)\s+([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',       # "pwd is X" or "pwd: X"
-    r'credentials\s+(?:are|is|:)\s+([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',  # "credentials are X"
-    r'login\s+(?:is|:)\s+([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',     # "login is X" or "login: X"
-    r'passw[o0]rd\s*[=:]\s*([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',   # password=X or password:X
-    r'the\s+password\s+(?:is|:)\s+([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',  # "the password is X"
+# Timestamp line pattern used when parsing message files (no $ to allow extra text).
+# One alternation so each line is matched once; group 1 is the timestamp in either format.
+TIMESTAMP_LINE_PATTERN = re.compile(
+    r'^(\w{3}\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M'    # Jan 15, 2025  2:30:15 PM
+    r'|\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)'     # 1/15/25 2:30:15 PM
+)
+
+# Timestamp formats parsed with strptime before falling back to dateutil's much
+# slower general parser (strptime matches a space in the format against any run
+# of whitespace). Two-digit years are left to dateutil, whose century handling differs.
+FAST_TIMESTAMP_FORMATS = [
+    '%b %d, %Y %I:%M:%S %p',  # Jan 15, 2025  2:30:15 PM
+    '%m/%d/%Y %I:%M:%S %p',   # 1/15/2025 2:30:15 PM
 ]
 
-def count_messages_in_file(file_path):
+# Transcript line classification (the sender line follows each timestamp line)
+ME_SENDER_LINES = frozenset({'Me', 'me'})  # Sender lines for messages you sent
+RECEIPT_LINE_PREFIXES = ('(Read by them', '(Delivered')  # Read/delivery info lines kept as metadata
+
+# The usual iMessage timestamp shape, split into fields so the datetime can be built
+# directly; anything this doesn't cover (or invalid values) goes through strptime
+MONTH_NAME_TIMESTAMP_PATTERN = re.compile(
+    r'([A-Za-z]{3})\s+(\d{1,2}),\s+(\d{4})\s+(\d{1,2}):(\d{2}):(\d{2})\s+([AP]M)'  # Jan 15, 2025  2:30:15 PM
+)
+MONTH_NUMBERS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+# Precompiled patterns for phone numbers, filenames and senders
+NON_DIGIT_PATTERN = re.compile(r'[^\d]')
+PHONE_NUMBER_PATTERN = re.compile(r'^\+?\d{10,15}$')      # Single phone number (sender lines)
+
+# Individual conversation filenames, classified in a single match. Anything
+# else (group chat IDs, comma separated participants, names) is a group chat.
+INDIVIDUAL_CHAT_NAME_PATTERN = re.compile(
+    r'(?!.* - \d+$)'               # Not a "Name - 12" group chat ID
+    r'(?:\+?\d{10,15}'             # Single phone number
+    r'|\d{3,6}'                    # Short codes like 12345
+    r'|[^@,]+@[^@,]+\.[^@,]+)'      # Single email address
+)
+MESSAGE_FILENAME_PATTERN = re.compile(r'messages_(\+\d+)_(.+)\.txt')
+UNSAFE_FILENAME_CHARS_TABLE = str.maketrans(dict.fromkeys('\\/*?:"<>|', '_'))  # Characters replaced with '_' in folder names
+
+# Raw vCard scanning, used to filter contacts without running the full vobject parser
+VCARD_BLOCK_PATTERN = re.compile(r'^BEGIN:VCARD\s*$.*?^END:VCARD\s*?$', re.I | re.M | re.S)
+VCARD_FOLDED_LINE_PATTERN = re.compile(r'\r?\n[ \t]')  # Continuation lines start with whitespace
+VCARD_NAME_PHONE_PATTERN = re.compile(r'^(?:[\w-]+\.)?(FN|TEL)((?:;[^:\r\n]*)?):(.*?)\r?$', re.I | re.M)
+
+# Exported message files per export directory ({dir: {filename: path}})
+_message_file_indexes = {}
+
+# Parsed message files keyed by (path, mtime_ns, size), oldest evicted first
+_parsed_message_files = {}
+
+class ParsedMessage:
+    """
+    A message being read from a transcript. Slots keep the per-message state
+    small; the dict used by the rest of the pipeline is built once by to_dict.
+    Content lines are collected in a list and joined once, since repeated
+    string concatenation is quadratic on long multi-line messages.
+    """
+    __slots__ = ('timestamp_raw', 'sender', 'content_parts', 'metadata')
+    
+    def __init__(self, timestamp_raw=''):
+        self.timestamp_raw = timestamp_raw
+        self.sender = 'unknown'
+        self.content_parts = []
+        self.metadata = None
+    
+    def to_dict(self):
+        """
+        Convert to the message dict format with a standardized ISO timestamp
+        """
+        message = {
+            'content': ' '.join(self.content_parts),
+            'sender': self.sender
+        }
+        if self.metadata is not None:
+            message['metadata'] = self.metadata
+        
+        try:
+            # Parse the timestamp and convert to ISO format, keeping the parsed
+            # datetime in '_ts' so later steps don't parse the string again
+            parsed_time = parse_timestamp(self.timestamp_raw)
+            message['timestamp'] = parsed_time.isoformat()
+            message['_ts'] = parsed_time
+        except Exception:
+            # If parsing fails, keep the raw timestamp as the timestamp
+            message['timestamp'] = self.timestamp_raw
+        
+        return message
+
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_timestamp(value):
+    """
+    Parse a message timestamp, trying ISO format and the known transcript
+    formats before dateutil. Raises like dateutil if nothing matches.
+    Results are memoized: the consolidated transcript sorts on the same
+    timestamp strings that were parsed when the message file was read.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    
+    match = MONTH_NAME_TIMESTAMP_PATTERN.fullmatch(value)
+    if match:
+        month_name, day, year, hour, minute, second, am_pm = match.groups()
+        month = MONTH_NUMBERS.get(month_name.lower())
+        hour = int(hour)
+        if month is not None and 1 <= hour <= 12:
+            hour = hour % 12 + (12 if am_pm == 'PM' else 0)
+            try:
+                return datetime(int(year), month, int(day), hour, int(minute), int(second))
+            except ValueError:
+                pass  # e.g. Feb 30 - let strptime/dateutil decide as before
+    
+    for timestamp_format in FAST_TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, timestamp_format)
+        except ValueError:
+            continue
+    
+    return parse(value)
+
+def get_file_version(file_path):
+    """
+    Get the (mtime_ns, size) of a file, used to key caches so a changed file is
+    never served stale results. Returns None if the file doesn't exist.
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+def count_messages_in_file(file_path, threshold=None):
     """
     Count the number of messages in a message text file.
     Messages are typically separated by timestamps.
+    If threshold is given, scanning stops as soon as that many messages are seen,
+    so the result is only exact when it's below the threshold.
     """
-    if not os.path.exists(file_path):
+    file_version = get_file_version(file_path)
+    if file_version is None:
         return 0
     
+    return _count_messages_cached(file_path, *file_version, threshold)
+
+@functools.lru_cache(maxsize=None)
+def _count_messages_cached(file_path, mtime_ns, size, threshold):
+    """
+    Count messages in a specific version of a message file (memoized)
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # Count message blocks - each message typically starts with a timestamp
-        # Look for patterns like "Jan 15, 2025  2:30:15 PM" or similar
-        timestamp_patterns = [
-            r'\b\w{3}\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M\b',  # Jan 15, 2025  2:30:15 PM
-            r'\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M',        # 1/15/25 2:30:15 PM
-            r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}',                        # 2025-01-15 14:30:15
-        ]
+        # Scan the memory-mapped file once (no decode, no copies into Python),
+        # tallying matches per timestamp format. Empty files can't be mapped.
+        format_counts = [0] * TIMESTAMP_COUNT_PATTERN.groups
+        line_breaks = 0
+        
+        if size:
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+                for match in TIMESTAMP_COUNT_PATTERN.finditer(file_map):
+                    format_index = match.lastindex - 1
+                    format_counts[format_index] += 1
+                    if threshold is not None and format_counts[format_index] >= threshold:
+                        return format_counts[format_index]  # Enough to answer the threshold test
+                
+                if not any(format_counts):
+                    # Count in bounded chunks rather than copying the whole map at once
+                    for chunk_start in range(0, len(file_map), LINE_COUNT_CHUNK_SIZE):
+                        line_breaks += file_map[chunk_start:chunk_start + LINE_COUNT_CHUNK_SIZE].count(b'\n')
         
-        message_count = 0
-        for pattern in timestamp_patterns:
-            matches = re.findall(pattern, content)
-            if matches:
-                message_count = max(message_count, len(matches))
+        message_count = max(format_counts)
         
         # Fallback: count by line breaks if no timestamps found
         if message_count == 0:
-            lines = [line.strip() for line in content.split('\n') if line.strip()]
             # Estimate messages (very rough - actual messages might be multi-line)
-            message_count = max(1, len(lines) // 3)  # Assume ~3 lines per message on average
+            message_count = max(1, line_breaks // 3)  # Assume ~3 lines per message on average
         
         return message_count
         
@@ -101,35 +252,71 @@ def count_messages_in_file(file_path):
         print(f"  ! Error counting messages in {file_path}: {str(e)}")
         return 0
 
-def get_total_message_count_for_contact(phone_numbers, temp_export_dir):
+def index_message_files(temp_export_dir):
+    """
+    Scan the message export directory once and remember its .txt files,
+    so per-contact lookups don't need a stat call per candidate filename
+    """
+    index = {}
+    if os.path.isdir(temp_export_dir):
+        with os.scandir(temp_export_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.txt'):
+                    index[entry.name] = entry.path
+    
+    _message_file_indexes[temp_export_dir] = index
+    return index
+
+def get_message_file_index(temp_export_dir):
+    """
+    Get the {filename: path} index of an export directory, scanning it only if
+    it hasn't been indexed yet
+    """
+    index = _message_file_indexes.get(temp_export_dir)
+    if index is None:
+        index = index_message_files(temp_export_dir)
+    return index
+
+def find_message_file(phone_number, temp_export_dir):
+    """
+    Find the exported message file for a phone number ("+1xxx.txt" or "1xxx.txt")
+    Returns the file path or None if there are no messages for that number.
+    """
+    index = get_message_file_index(temp_export_dir)
+    
+    file_path = index.get(f"{phone_number}.txt")
+    if file_path is None:
+        file_path = index.get(f"{phone_number.replace('+', '')}.txt")
+    return file_path
+
+def get_total_message_count_for_contact(phone_numbers, temp_export_dir, threshold=None):
     """
     Get the total message count across all phone numbers for a contact
+    If threshold is given, counting stops once the total reaches it.
     """
     total_count = 0
     
     for phone_number in phone_numbers:
-        # Find the message file in temp export
-        phone_clean = phone_number.replace('+', '')
-        possible_filenames = [
-            f"{phone_number}.txt",
-            f"{phone_clean}.txt"
-        ]
+        if threshold is not None and total_count >= threshold:
+            break
         
-        for filename in possible_filenames:
-            file_path = os.path.join(temp_export_dir, filename)
-            if os.path.exists(file_path):
-                count = count_messages_in_file(file_path)
-                total_count += count
-                break  # Found the file, don't check other variations
+        # Find the message file in temp export
+        file_path = find_message_file(phone_number, temp_export_dir)
+        if file_path:
+            remaining = threshold - total_count if threshold is not None else None
+            total_count += count_messages_in_file(file_path, remaining)
     
     return total_count
 
+@functools.lru_cache(maxsize=PHONE_NUMBER_CACHE_SIZE)
 def normalize_phone_number(phone_str):
     """
     Normalize phone number to match iMessage exporter format (+1xxxxxxxxxx)
+    The same numbers are normalized repeatedly (every group chat sender line),
+    so results are memoized.
     """
     # Remove all non-digit characters
-    digits_only = re.sub(r'[^\d]', '', phone_str)
+    digits_only = NON_DIGIT_PATTERN.sub('', phone_str)
     
     # Handle different phone number formats
     if len(digits_only) == 10:
@@ -152,34 +339,9 @@ def is_group_chat_filename(filename):
     # Remove .txt extension
     name = filename.replace('.txt', '')
     
-    # Group chat indicators:
-    # 1. Contains " - " followed by numbers (group chat IDs)
-    if re.search(r' - \d+$', name):
-        return True
-    
-    # 2. Contains multiple phone numbers (comma separated)
-    if ',' in name:
-        return True
-    
-    # 3. Contains spaces and isn't just a phone number or email
-    if ' ' in name and not re.match(r'^\+?\d+$', name) and '@' not in name:
-        return True
-    
-    # Individual conversation indicators:
-    # 1. Single phone number format
-    if re.match(r'^\+?\d{10,15}$', name):
-        return False
-    
-    # 2. Single email address
-    if re.match(r'^[^@]+@[^@]+\.[^@]+$', name):
-        return False
-    
-    # 3. Short codes (like 12345)
-    if re.match(r'^\d{3,6}$', name):
-        return False
-    
-    # Default to group chat if uncertain
-    return True
+    # Individual conversations are a single phone number, email address or
+    # short code; everything else (including uncertain names) is a group chat
+    return INDIVIDUAL_CHAT_NAME_PATTERN.fullmatch(name) is None
 
 def export_messages_including_groups(temp_export_dir):
     """
@@ -201,17 +363,16 @@ def export_messages_including_groups(temp_export_dir):
             print(f"Warning: imessage-exporter returned code {result.returncode}")
             print(f"stderr: {result.stderr}")
         
-        # Categorize all message files
+        # Categorize all message files from the same directory scan that indexes
+        # them for per-contact lookups, so the export is only listed once
         individual_files = []
         group_files = []
         
-        if os.path.exists(temp_export_dir):
-            for filename in os.listdir(temp_export_dir):
-                if filename.endswith('.txt'):
-                    if is_group_chat_filename(filename):
-                        group_files.append(filename)
-                    else:
-                        individual_files.append(filename)
+        for filename in index_message_files(temp_export_dir):
+            if is_group_chat_filename(filename):
+                group_files.append(filename)
+            else:
+                individual_files.append(filename)
         
         print(f"Found {len(individual_files)} individual conversations")
         print(f"Found {len(group_files)} group chats")
@@ -222,19 +383,24 @@ def export_messages_including_groups(temp_export_dir):
         print(f"Error exporting messages: {str(e)}")
         return [], []
 
+def get_vcard_type_label(component, default):
+    """
+    Get the TYPE parameter of a vCard property (e.g. "cell,voice") or the default
+    """
+    types = component.params.get("TYPE")
+    if types is None:
+        return default
+    # vobject stores parameter values as a list, e.g. ['CELL', 'VOICE']
+    return ", ".join(types).lower()
+
 def get_phone_type_from_vcard(vcard, phone_number):
     """
     Get the type/label for a phone number from the vcard
     """
-    if hasattr(vcard, 'tel'):
-        for tel in vcard.tel_list:
-            normalized = normalize_phone_number(tel.value)
-            if normalized == phone_number:
-                try:
-                    params = str(tel.params["TYPE"]).replace("[","").replace("]","").replace("'","").lower()
-                    return params
-                except KeyError:
-                    return "phone"
+    for tel in vcard.contents.get('tel', []):
+        normalized = normalize_phone_number(tel.value)
+        if normalized == phone_number:
+            return get_vcard_type_label(tel, "phone")
     return "phone"
 
 def copy_message_file_for_contact(phone_number, contact_folder, contact_name, vcard, temp_export_dir):
@@ -242,30 +408,87 @@ def copy_message_file_for_contact(phone_number, contact_folder, contact_name, vc
     Copy the message file for a specific phone number to the contact's folder
     """
     # Find the message file in temp export
-    phone_clean = phone_number.replace('+', '')
-    possible_filenames = [
-        f"{phone_number}.txt",
-        f"{phone_clean}.txt"
-    ]
-    
-    for filename in possible_filenames:
-        source_path = os.path.join(temp_export_dir, filename)
-        if os.path.exists(source_path):
-            # Get phone type for filename
-            phone_type = get_phone_type_from_vcard(vcard, phone_number)
-            
-            # Create descriptive filename
-            dest_filename = f"messages_{phone_number}_{phone_type}.txt"
-            dest_path = os.path.join(contact_folder, dest_filename)
-            
-            # Copy the file
-            shutil.copy2(source_path, dest_path)
-            print(f"  ✓ Copied messages for {phone_number} ({phone_type})")
-            return dest_filename
+    source_path = find_message_file(phone_number, temp_export_dir)
+    if source_path:
+        # Get phone type for filename
+        phone_type = get_phone_type_from_vcard(vcard, phone_number)
+        
+        # Create descriptive filename
+        dest_filename = f"messages_{phone_number}_{phone_type}.txt"
+        dest_path = os.path.join(contact_folder, dest_filename)
+        
+        # Link (or copy) the file
+        link_or_copy_file(source_path, dest_path)
+        print(f"  ✓ Copied messages for {phone_number} ({phone_type})")
+        return dest_filename
     
     print(f"  ! No messages found for {phone_number}")
     return None
 
+def link_or_copy_file(source_path, dest_path):
+    """
+    Place a message file at dest_path as a hardlink to the exported original,
+    falling back to a regular copy when linking isn't possible (e.g. across
+    filesystems). Message files are only read afterwards, so sharing is safe.
+    """
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    
+    try:
+        os.link(source_path, dest_path)
+    except OSError:
+        shutil.copy2(source_path, dest_path)
+
+def iter_vcard_blocks(vcard_data):
+    """
+    Split raw VCF text into the text of each BEGIN:VCARD ... END:VCARD block
+    """
+    for match in VCARD_BLOCK_PATTERN.finditer(vcard_data):
+        yield match.group(0)
+
+def get_vcard_name_and_phones(vcard):
+    """
+    Get the display name (None if the card has no FN) and normalized phone
+    numbers of a parsed vCard
+    """
+    contact_name = vcard.fn.value if hasattr(vcard, 'fn') else None
+    phone_numbers = [normalize_phone_number(tel.value) for tel in vcard.contents.get('tel', [])]
+    return contact_name, phone_numbers
+
+def read_vcard_name_and_phones(vcard_block):
+    """
+    Read the display name and normalized phone numbers straight from a raw vCard
+    block. This is all that's needed to decide whether a contact is exported, so
+    most cards never go through vobject. Cards with encoded or escaped values
+    fall back to the full parser.
+    """
+    properties = VCARD_NAME_PHONE_PATTERN.findall(VCARD_FOLDED_LINE_PATTERN.sub('', vcard_block))
+    if any('ENCODING' in params.upper() or '\\' in value for _, params, value in properties):
+        return get_vcard_name_and_phones(vobject.readOne(vcard_block))
+    
+    contact_name = None
+    phone_numbers = []
+    for name, params, value in properties:
+        if name.upper() == 'TEL':
+            phone_numbers.append(normalize_phone_number(value))
+        elif contact_name is None:
+            contact_name = value
+    
+    return contact_name, phone_numbers
+
+def write_binary_file(file_path, content):
+    """
+    Write bytes straight to a file descriptor, skipping the buffered file object
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(content)
+        while view:
+            # os.write may write less than requested, so keep going until done
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 def read_vcf_file(file_path):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -294,7 +517,7 @@ def get_last_message_info(messages):
     
     # Try to format the date nicely
     try:
-        parsed_date = parse(last_message_info['last_message_date'])
+        parsed_date = parse_timestamp(last_message_info['last_message_date'])
         last_message_info['last_message_date_formatted'] = parsed_date.strftime('%Y-%m-%d')
         last_message_info['last_message_timestamp'] = parsed_date.isoformat()
     except Exception:
@@ -307,9 +530,18 @@ def get_last_message_info(messages):
 def vcard_to_json(vcard, contact_folder, message_files, conversation_metadata=None, last_message_info=None):
     """
     Convert vCard to structured JSON data with optional conversation insights
+    The contact folder (and its attachments folder if the card has a photo) must already exist
     """
+    # Resolve properties straight from the parsed contents dict instead of going
+    # through vobject's attribute lookup (hasattr / *_list) for every field
+    contents = vcard.contents
+    
+    def first_value(name):
+        components = contents.get(name)
+        return components[0].value if components else None
+    
     contact_data = {
-        "name": vcard.fn.value,
+        "name": first_value('fn'),
         "contact_information": {},
         "personal_information": {},
         "professional_information": {},
@@ -329,99 +561,97 @@ def vcard_to_json(vcard, contact_folder, message_files, conversation_metadata=No
         contact_data["last_message_info"] = last_message_info
 
     # Add addressbook link if available
-    if hasattr(vcard, 'x_abuid'):
-        contact_data["metadata"]["addressbook_id"] = vcard.x_abuid.value
-        contact_data["metadata"]["addressbook_link"] = f"addressbook://{vcard.x_abuid.value}"
+    addressbook_id = first_value('x-abuid')
+    if addressbook_id is not None:
+        contact_data["metadata"]["addressbook_id"] = addressbook_id
+        contact_data["metadata"]["addressbook_link"] = f"addressbook://{addressbook_id}"
 
     # Collect phone numbers for message export
     phone_numbers = []
     
     # Email addresses
-    if hasattr(vcard, 'email'):
+    if 'email' in contents:
         contact_data["contact_information"]["emails"] = []
-        for email in vcard.email_list:
+        for email in contents['email']:
             email_entry = {
                 "address": email.value,
-                "mailto_link": f"mailto:{email.value}"
+                "mailto_link": f"mailto:{email.value}",
+                "type": get_vcard_type_label(email, "email")
             }
-            try:
-                email_entry["type"] = str(email.params["TYPE"]).replace("[","").replace("]","").replace("'","").lower()
-            except KeyError:  
-                email_entry["type"] = "email"
             contact_data["contact_information"]["emails"].append(email_entry)
 
     # Phone numbers
-    if hasattr(vcard, 'tel'):
+    if 'tel' in contents:
         contact_data["contact_information"]["phone_numbers"] = []
-        for tel in vcard.tel_list:
+        for tel in contents['tel']:
             normalized_phone = normalize_phone_number(tel.value)
             phone_numbers.append(normalized_phone)
             phone_entry = {
                 "number": normalized_phone,
                 "tel_link": f"tel:{normalized_phone}",
-                "original": tel.value
+                "original": tel.value,
+                "type": get_vcard_type_label(tel, "phone")
             }
-            try:
-                phone_entry["type"] = str(tel.params["TYPE"]).replace("[","").replace("]","").replace("'","").lower()
-            except KeyError:
-                phone_entry["type"] = "phone"
             contact_data["contact_information"]["phone_numbers"].append(phone_entry)
 
     # Personal information
-    if hasattr(vcard, 'bday'):
+    bday_value = first_value('bday')
+    if bday_value is not None:
         try:
-            bday = parse(vcard.bday.value)
+            bday = parse(bday_value)
             contact_data["personal_information"]["birthday"] = {
                 "date": bday.strftime("%Y-%m-%d"),
-                "original": vcard.bday.value
+                "original": bday_value
             }
         except Exception:
             pass
 
-    if hasattr(vcard, 'x_anniversary'):
+    anniversary_value = first_value('x-anniversary')
+    if anniversary_value is not None:
         try:
-            anniversary = parse(vcard.x_anniversary.value)
+            anniversary = parse(anniversary_value)
             contact_data["personal_information"]["anniversary"] = {
                 "date": anniversary.strftime("%Y-%m-%d"),
-                "original": vcard.x_anniversary.value
+                "original": anniversary_value
             }
         except Exception:
             pass
 
-    if hasattr(vcard, 'x_gender'):
-        gender = "Female" if vcard.x_gender.value.lower() == "f" else "Male"
+    gender_value = first_value('x-gender')
+    if gender_value is not None:
+        gender = "Female" if gender_value.lower() == "f" else "Male"
         contact_data["personal_information"]["gender"] = {
             "display": gender,
-            "original": vcard.x_gender.value
+            "original": gender_value
         }
 
     # Professional information
-    if hasattr(vcard, 'org'):
-        contact_data["professional_information"]["organization"] = vcard.org.value[0]
+    if 'org' in contents:
+        contact_data["professional_information"]["organization"] = first_value('org')[0]
 
-    if hasattr(vcard, 'title'):
-        contact_data["professional_information"]["title"] = vcard.title.value
+    if 'title' in contents:
+        contact_data["professional_information"]["title"] = first_value('title')
 
-    if hasattr(vcard, 'role'):
-        contact_data["professional_information"]["role"] = vcard.role.value
+    if 'role' in contents:
+        contact_data["professional_information"]["role"] = first_value('role')
 
     # Social media and websites
-    if hasattr(vcard, 'url'):
+    if 'url' in contents:
         contact_data["online_presence"]["urls"] = []
-        urls_to_process = vcard.url_list if isinstance(vcard.url_list, list) else [vcard.url]
         
-        for url in urls_to_process:
+        for url in contents['url']:
             url_value = url.value.strip()
             url_entry = {
                 "url": url_value,
                 "original": url_value
             }
             
-            if 'linkedin.com' in url_value.lower():
+            url_lower = url_value.lower()
+            if 'linkedin.com' in url_lower:
                 url_entry["platform"] = "linkedin"
-            elif 'twitter.com' in url_value.lower():
+            elif 'twitter.com' in url_lower:
                 url_entry["platform"] = "twitter"
-            elif 'instagram.com' in url_value.lower():
+            elif 'instagram.com' in url_lower:
                 url_entry["platform"] = "instagram"
             else:
                 url_entry["platform"] = "website"
@@ -429,39 +659,37 @@ def vcard_to_json(vcard, contact_folder, message_files, conversation_metadata=No
             contact_data["online_presence"]["urls"].append(url_entry)
 
     # Additional information
-    if hasattr(vcard, 'note'):
-        contact_data["additional_information"]["note"] = vcard.note.value
+    if 'note' in contents:
+        contact_data["additional_information"]["note"] = first_value('note')
 
-    if hasattr(vcard, 'lang'):
-        contact_data["additional_information"]["language"] = vcard.lang.value
+    if 'lang' in contents:
+        contact_data["additional_information"]["language"] = first_value('lang')
 
-    if hasattr(vcard, 'geo'):
-        contact_data["additional_information"]["location"] = vcard.geo.value
+    if 'geo' in contents:
+        contact_data["additional_information"]["location"] = first_value('geo')
 
-    if hasattr(vcard, 'adr'):
+    if 'adr' in contents:
         contact_data["additional_information"]["addresses"] = []
-        for adr in vcard.adr_list:
+        for adr in contents['adr']:
             address_str = str(adr.value).replace('\n', ' ')
             contact_data["additional_information"]["addresses"].append(address_str)
 
     # Handle photo attachment
-    if hasattr(vcard, 'photo'):
+    if 'photo' in contents:
+        photo = contents['photo'][0]
         try:
             # Save photo in contact's folder
             attachment_folder = os.path.join(contact_folder, ATTACHMENT_FOLDER)
-            os.makedirs(attachment_folder, exist_ok=True)
-            
-            file_name = f"photo.{vcard.photo.params['TYPE'][0].lower()}"
+            file_name = f"photo.{photo.params['TYPE'][0].lower()}"
             photo_path = os.path.join(attachment_folder, file_name)
             
-            with open(photo_path, 'wb') as fid:
-                fid.write(vcard.photo.value)
+            write_binary_file(photo_path, photo.value)
             
             contact_data["attachments"].append({
                 "type": "photo",
                 "filename": file_name,
                 "path": f"{ATTACHMENT_FOLDER}/{file_name}",
-                "mime_type": vcard.photo.params['TYPE'][0].lower()
+                "mime_type": photo.params['TYPE'][0].lower()
             })
         except Exception:
             pass
@@ -471,7 +699,7 @@ def vcard_to_json(vcard, contact_folder, message_files, conversation_metadata=No
         for i, message_file in enumerate(message_files):
             if message_file:
                 # Extract phone number and type from filename
-                match = re.match(r'messages_(\+\d+)_(.+)\.txt', message_file)
+                match = MESSAGE_FILENAME_PATTERN.match(message_file)
                 if match:
                     phone_num, phone_type = match.groups()
                     contact_data["message_history"].append({
@@ -486,6 +714,12 @@ def vcard_to_json(vcard, contact_folder, message_files, conversation_metadata=No
     
     return contact_data, phone_numbers
 
+def get_generated_at():
+    """
+    Get the current UTC time as the generated_at value for export metadata
+    """
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
 def create_summary_files(contact_data, output_folder):
     """
     Create summary index files in JSON format
@@ -493,11 +727,14 @@ def create_summary_files(contact_data, output_folder):
     summary_folder = os.path.join(output_folder, SUMMARY_FOLDER)
     os.makedirs(summary_folder, exist_ok=True)
     
+    # Both summaries share one generation time
+    generated_at = get_generated_at()
+    
     # All contacts summary
     all_contacts = {
         "metadata": {
             "total_contacts": len(contact_data),
-            "generated_at": "2025-01-15T06:06:00Z",
+            "generated_at": generated_at,
             "format": "contacts_export_v2_json"
         },
         "contacts": []
@@ -506,7 +743,7 @@ def create_summary_files(contact_data, output_folder):
     contacts_with_messages = {
         "metadata": {
             "total_contacts_with_messages": 0,
-            "generated_at": "2025-01-15T06:06:00Z",
+            "generated_at": generated_at,
             "format": "contacts_export_v2_json"
         },
         "contacts": []
@@ -540,11 +777,8 @@ def create_summary_files(contact_data, output_folder):
     contacts_with_messages["metadata"]["total_contacts_with_messages"] = contacts_with_msgs
     
     # Write summary files
-    with open(os.path.join(summary_folder, 'all_contacts.json'), 'w', encoding='utf-8') as f:
-        json.dump(all_contacts, f, indent=2, ensure_ascii=False)
-    
-    with open(os.path.join(summary_folder, 'contacts_with_messages.json'), 'w', encoding='utf-8') as f:
-        json.dump(contacts_with_messages, f, indent=2, ensure_ascii=False)
+    write_json_file(os.path.join(summary_folder, 'all_contacts.json'), all_contacts)
+    write_json_file(os.path.join(summary_folder, 'contacts_with_messages.json'), contacts_with_messages)
     
     print(f"\n📊 Summary:")
     print(f"   Total contacts: {len(contact_data)}")
@@ -555,7 +789,8 @@ def process_vcard_data(vcard_data):
         # Reset person mapping for clean ID assignment
         reset_person_mapping()
         
-        vcards = vobject.readComponents(vcard_data)
+        # Split the VCF into raw cards; only contacts that get exported are fully parsed
+        vcard_blocks = list(iter_vcard_blocks(vcard_data))
         
         # Create main output folder
         os.makedirs(MAIN_OUTPUT_FOLDER, exist_ok=True)
@@ -567,10 +802,7 @@ def process_vcard_data(vcard_data):
         print("🔄 Step 1: Exporting all individual messages...")
         individual_message_files, group_message_files = export_messages_including_groups(temp_export_dir)
         
-        print(f"\n🔄 Step 2: Processing {len(list(vcards))} contacts...")
-        
-        # Reset vcards iterator
-        vcards = vobject.readComponents(vcard_data)
+        print(f"\n🔄 Step 2: Processing {len(vcard_blocks)} contacts...")
         
         contact_count = 0
         contact_data = {}
@@ -581,23 +813,22 @@ def process_vcard_data(vcard_data):
         all_messages_folder = os.path.join(MAIN_OUTPUT_FOLDER, ALL_MESSAGES_FOLDER)
         os.makedirs(all_messages_folder, exist_ok=True)
         
-        for vcard in vcards:
-            if hasattr(vcard, 'fn'):
-                contact_name = vcard.fn.value
-                safe_contact_name = re.sub(r'[\\/*?:"<>|]', '_', contact_name)
-                
-                # Get phone numbers first to check message count
-                phone_numbers = []
-                if hasattr(vcard, 'tel'):
-                    for tel in vcard.tel_list:
-                        phone_numbers.append(normalize_phone_number(tel.value))
+        # Filter contacts by message count first, then export the ones that qualify
+        contacts_to_export = []
+        for vcard_block in vcard_blocks:
+            contact_name, phone_numbers = read_vcard_name_and_phones(vcard_block)
+            if contact_name is not None:
+                safe_contact_name = contact_name.translate(UNSAFE_FILENAME_CHARS_TABLE)
                 
                 # Check if contact has enough messages
                 if phone_numbers:
-                    total_message_count = get_total_message_count_for_contact(phone_numbers, temp_export_dir)
-                    print(f"\n📇 {contact_name}: {total_message_count} messages")
+                    # Only need to know whether the contact reaches the minimum
+                    total_message_count = get_total_message_count_for_contact(
+                        phone_numbers, temp_export_dir, MIN_MESSAGE_COUNT
+                    )
                     
                     if total_message_count < MIN_MESSAGE_COUNT:
+                        print(f"\n📇 {contact_name}: {total_message_count} messages")
                         print(f"  ⏭️  Skipping (less than {MIN_MESSAGE_COUNT} messages)")
                         filtered_count += 1
                         continue
@@ -607,83 +838,141 @@ def process_vcard_data(vcard_data):
                     filtered_count += 1
                     continue
                 
-                print(f"  ✅ Processing (has {total_message_count} messages)")
-                
-                # Create contact folder
-                contact_folder = os.path.join(MAIN_OUTPUT_FOLDER, safe_contact_name)
-                os.makedirs(contact_folder, exist_ok=True)
-                
-                # Copy individual message files for this contact (optional, for debugging)
-                message_files = []
-                if CREATE_INDIVIDUAL_MESSAGE_FILES:
-                    print(f"  📄 Creating individual message files...")
-                    for phone in phone_numbers:
-                        message_file = copy_message_file_for_contact(
-                            phone, contact_folder, contact_name, vcard, temp_export_dir
-                        )
-                        if message_file:
-                            message_files.append(message_file)
-                else:
-                    print(f"  ⏭️  Skipping individual message files (CREATE_INDIVIDUAL_MESSAGE_FILES=False)")
-                
-                # Create consolidated message file (merges all phone numbers)
-                if CREATE_CONSOLIDATED_MESSAGE_FILES:
-                    consolidated_file = create_consolidated_message_file(
-                        contact_name, phone_numbers, temp_export_dir, contact_folder
-                    )
-                    if consolidated_file:
-                        message_files.append(consolidated_file)
-                        print(f"  ✅ Using consolidated message file for all processing")
-                else:
-                    print(f"  ⚠️  Warning: CREATE_CONSOLIDATED_MESSAGE_FILES is disabled")
+                # Full vCard parsing is only needed for contacts that are exported
+                vcard = vobject.readOne(vcard_block)
+                contacts_to_export.append((vcard, contact_name, safe_contact_name, phone_numbers))
+        
+        # Create all contact and attachment folders in one pass instead of per contact
+        planned_folders = set()
+        for vcard, _, safe_contact_name, _ in contacts_to_export:
+            contact_folder = os.path.join(MAIN_OUTPUT_FOLDER, safe_contact_name)
+            planned_folders.add(contact_folder)
+            if 'photo' in vcard.contents:
+                planned_folders.add(os.path.join(contact_folder, ATTACHMENT_FOLDER))
+        
+        # Sorted so parent folders are created before their attachment folders
+        for folder in sorted(planned_folders):
+            os.makedirs(folder, exist_ok=True)
+        
+        # Per-contact JSON files (contact.json and the LLM files) are written by background
+        # threads; they are all on disk before the master files below read them back
+        with ProcessPoolExecutor(max_workers=PARALLEL_WORKERS) as executor, \
+                background_json_writes(JSON_WRITER_THREADS):
+            for batch_start in range(0, len(contacts_to_export), CONTACT_BATCH_SIZE):
+                batch = contacts_to_export[batch_start:batch_start + CONTACT_BATCH_SIZE]
                 
-                # Process contact for LLM-ready format to get conversation metadata
-                llm_file_path, llm_data = process_contact_for_llm_files(
-                    contact_name, phone_numbers, vcard, temp_export_dir, MAIN_OUTPUT_FOLDER,
-                    consolidate_contact_messages
+                # Parse this batch's message files in parallel. The per-contact export
+                # below stays sequential because privacy placeholder IDs are assigned
+                # in processing order.
+                prefetch_message_files(
+                    [find_message_file(phone, temp_export_dir)
+                     for _, _, _, batch_phone_numbers in batch
+                     for phone in batch_phone_numbers],
+                    executor
                 )
                 
-                # Extract conversation metadata for contact file
-                conversation_metadata = llm_data['metadata'] if llm_data else None
-                
-                # Get last message info
-                messages, _ = consolidate_contact_messages(contact_name, phone_numbers, temp_export_dir)
-                last_message_info = get_last_message_info(messages)
-                
-                # Generate contact JSON with conversation insights
-                contact_json, _ = vcard_to_json(vcard, contact_folder, message_files, conversation_metadata, last_message_info)
-                
-                # Save contact file as JSON
-                contact_file_path = os.path.join(contact_folder, 'contact.json')
-                with open(contact_file_path, 'w', encoding='utf-8') as json_file:
-                    json.dump(contact_json, json_file, indent=2, ensure_ascii=False)
-                
-                if llm_data:
-                    llm_conversations_data[safe_contact_name] = llm_data
-                    print(f"  ✓ Created LLM conversation: {llm_data['metadata']['total_messages']} messages")
-                    if llm_data.get('interaction_analysis'):
-                        interaction_stats = llm_data['interaction_analysis']
-                        print(f"  ✓ Created recent interactions: {interaction_stats.get('message_count', 0)} messages analyzed")
-                        print(f"    - Response pairs: {interaction_stats.get('response_pairs', 0)}")
-                        print(f"    - Interaction ratio: {interaction_stats.get('interaction_ratio', 0)}")
-                    print(f"  ✓ Added conversation insights to contact.json")
-                
-                # Store contact data for summary
-                contact_data[safe_contact_name] = {
-                    'phone_numbers': phone_numbers,
-                    'message_files': message_files
-                }
+                # Consolidate each contact's messages once (reused for the LLM files and
+                # the last message info) and clean/analyze the conversations in parallel too;
+                # anonymizing and writing the LLM files happens in order below
+                batch_messages = []
+                batch_llm_content = []
+                batch_consolidated_files = []
+                for vcard, contact_name, safe_contact_name, phone_numbers in batch:
+                    # The consolidated transcript re-reads and sorts the raw files, so it is
+                    # written by a worker too; its progress output is printed in order below
+                    batch_consolidated_files.append(
+                        executor.submit(
+                            call_with_captured_output, create_consolidated_message_file, contact_name,
+                            phone_numbers, temp_export_dir, os.path.join(MAIN_OUTPUT_FOLDER, safe_contact_name)
+                        ) if CREATE_CONSOLIDATED_MESSAGE_FILES else None
+                    )
+                    
+                    messages, phone_usage = consolidate_contact_messages(contact_name, phone_numbers, temp_export_dir)
+                    batch_messages.append((messages, phone_usage))
+                    batch_llm_content.append(
+                        executor.submit(
+                            prepare_llm_content, get_llm_contact_data(phone_numbers, vcard, phone_usage), messages
+                        ) if messages else None
+                    )
                 
-                print(f"  ✓ Saved: {contact_file_path}")
-                contact_count += 1
+                for batch_index, (vcard, contact_name, safe_contact_name, phone_numbers) in enumerate(batch):
+                    print(f"\n📇 {contact_name}: {MIN_MESSAGE_COUNT}+ messages")
+                    print(f"  ✅ Processing (has at least {MIN_MESSAGE_COUNT} messages)")
+                    
+                    # Contact folder was created up front with the other planned folders
+                    contact_folder = os.path.join(MAIN_OUTPUT_FOLDER, safe_contact_name)
+                    
+                    # Copy individual message files for this contact (optional, for debugging)
+                    message_files = []
+                    if CREATE_INDIVIDUAL_MESSAGE_FILES:
+                        print(f"  📄 Creating individual message files...")
+                        for phone in phone_numbers:
+                            message_file = copy_message_file_for_contact(
+                                phone, contact_folder, contact_name, vcard, temp_export_dir
+                            )
+                            if message_file:
+                                message_files.append(message_file)
+                    else:
+                        print(f"  ⏭️  Skipping individual message files (CREATE_INDIVIDUAL_MESSAGE_FILES=False)")
+                    
+                    # Create consolidated message file (merges all phone numbers)
+                    if CREATE_CONSOLIDATED_MESSAGE_FILES:
+                        consolidated_file, consolidated_output = batch_consolidated_files[batch_index].result()
+                        print(consolidated_output, end='')
+                        if consolidated_file:
+                            message_files.append(consolidated_file)
+                            print(f"  ✅ Using consolidated message file for all processing")
+                    else:
+                        print(f"  ⚠️  Warning: CREATE_CONSOLIDATED_MESSAGE_FILES is disabled")
+                    
+                    messages, phone_usage = batch_messages[batch_index]
+                    llm_content = batch_llm_content[batch_index]
+                    
+                    # Process contact for LLM-ready format to get conversation metadata
+                    llm_file_path, llm_data = process_contact_for_llm_files(
+                        contact_name, phone_numbers, vcard, MAIN_OUTPUT_FOLDER, messages, phone_usage,
+                        llm_content.result() if llm_content else None
+                    )
+                    
+                    # Extract conversation metadata for contact file
+                    conversation_metadata = llm_data['metadata'] if llm_data else None
+                    
+                    # Get last message info
+                    last_message_info = get_last_message_info(messages)
+                    
+                    # Generate contact JSON with conversation insights
+                    contact_json, _ = vcard_to_json(vcard, contact_folder, message_files, conversation_metadata, last_message_info)
+                    
+                    # Save contact file as JSON
+                    contact_file_path = os.path.join(contact_folder, 'contact.json')
+                    write_json_file(contact_file_path, contact_json)
+                    
+                    if llm_data:
+                        llm_conversations_data[safe_contact_name] = llm_data
+                        print(f"  ✓ Created LLM conversation: {llm_data['metadata']['total_messages']} messages")
+                        if llm_data.get('interaction_analysis'):
+                            interaction_stats = llm_data['interaction_analysis']
+                            print(f"  ✓ Created recent interactions: {interaction_stats.get('message_count', 0)} messages analyzed")
+                            print(f"    - Response pairs: {interaction_stats.get('response_pairs', 0)}")
+                            print(f"    - Interaction ratio: {interaction_stats.get('interaction_ratio', 0)}")
+                        print(f"  ✓ Added conversation insights to contact.json")
+                    
+                    # Store contact data for summary
+                    contact_data[safe_contact_name] = {
+                        'phone_numbers': phone_numbers,
+                        'message_files': message_files
+                    }
+                    
+                    print(f"  ✓ Saved: {contact_file_path}")
+                    contact_count += 1
         
         # Copy all individual message files to flat folder for compatibility
         print(f"\n🔄 Step 3: Creating flat message folder for compatibility...")
+        # The files come from the export directory scan, so they don't need another exists check
         for filename in individual_message_files:
             source = os.path.join(temp_export_dir, filename)
             dest = os.path.join(all_messages_folder, filename)
-            if os.path.exists(source):
-                shutil.copy2(source, dest)
+            link_or_copy_file(source, dest)
         
         # Process group chats
         group_chat_data = process_group_chats(group_message_files, temp_export_dir, MAIN_OUTPUT_FOLDER)
@@ -749,83 +1038,106 @@ def parse_message_file_for_llm(file_path, phone_number):
     """
     Parse a message file and extract structured message data for LLM processing
     """
-    if not os.path.exists(file_path):
+    file_version = get_file_version(file_path)
+    if file_version is None:
         return []
     
+    # Each contact's files are parsed more than once (LLM files, last message info),
+    # so parsed results are memoized. Only the list is copied: the message dicts are
+    # shared with the cache, so callers must treat them as read-only
+    cache_key = (file_path, *file_version)
+    messages = _parsed_message_files.get(cache_key)
+    if messages is None:
+        messages = _parse_message_file(file_path)
+        cache_parsed_messages(cache_key, messages)
+    
+    return list(messages)
+
+def cache_parsed_messages(cache_key, messages):
+    """
+    Store parsed messages for a file version, evicting the oldest entries
+    once more than MESSAGE_PARSE_CACHE_SIZE files are cached
+    """
+    _parsed_message_files[cache_key] = messages
+    while len(_parsed_message_files) > MESSAGE_PARSE_CACHE_SIZE:
+        del _parsed_message_files[next(iter(_parsed_message_files))]
+
+def prefetch_message_files(file_paths, executor):
+    """
+    Parse a batch of message files in worker processes and cache the results,
+    so the sequential per-contact processing finds them already parsed
+    """
+    pending = {}
+    for file_path in file_paths:
+        file_version = get_file_version(file_path) if file_path else None
+        if file_version is None:
+            continue
+        
+        cache_key = (file_path, *file_version)
+        if cache_key not in _parsed_message_files and cache_key not in pending:
+            pending[cache_key] = executor.submit(_parse_message_file, file_path)
+    
+    for cache_key, future in pending.items():
+        cache_parsed_messages(cache_key, future.result())
+
+def call_with_captured_output(func, *args):
+    """
+    Call func and return (result, printed output), so work done in a worker
+    process can have its progress messages printed by the parent in order
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = func(*args)
+    return result, output.getvalue()
+
+def _parse_message_file(file_path):
+    """
+    Parse a message file without caching (runs in worker processes too)
+    """
     messages = []
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split content into blocks by double newlines or timestamp patterns
-        lines = content.split('\n')
-        current_message = {}
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if line is a timestamp
-            timestamp_patterns = [
-                r'^(\w{3}\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)',  # Jan 15, 2025  2:30:15 PM (removed $ to allow extra text)
-                r'^(\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)',    # 1/15/25 2:30:15 PM (removed $ to allow extra text)
-            ]
+            # Stream line by line instead of loading the whole transcript
+            current_message = ParsedMessage()
             
-            timestamp_match = None
-            for pattern in timestamp_patterns:
-                timestamp_match = re.match(pattern, line)
-                if timestamp_match:
-                    break
-            
-            if timestamp_match:
-                # Save previous message if exists
-                if current_message.get('content'):
-                    messages.append(current_message.copy())
-                
-                # Start new message
-                current_message = {
-                    'timestamp_raw': timestamp_match.group(1),
-                    'content': '',
-                    'sender': 'unknown'
-                }
-                
-            elif line in ['Me', 'me']:
-                current_message['sender'] = 'me'
-                
-            elif line.startswith('+') or line.startswith('1'):
-                # Phone number line - indicates contact sent this
-                current_message['sender'] = 'contact'
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
                 
-            elif line.startswith('(Read by them') or line.startswith('(Delivered'):
-                # Read receipt or delivery info - add to metadata
-                if 'metadata' not in current_message:
-                    current_message['metadata'] = []
-                current_message['metadata'].append(line)
+                # Check if line is a timestamp
+                timestamp_match = TIMESTAMP_LINE_PATTERN.match(line)
                 
-            else:
-                # Content line
-                if current_message.get('content'):
-                    current_message['content'] += ' ' + line
+                if timestamp_match:
+                    # Save previous message if exists (a new one replaces it, so no copy is needed)
+                    if current_message.content_parts:
+                        messages.append(current_message.to_dict())
+                    
+                    # Start new message
+                    current_message = ParsedMessage(timestamp_match.group(1))
+                    
+                # The remaining line kinds start differently, so dispatch on the first character
+                elif line[0] in '+1' and line[1:].isdigit():
+                    # Phone number line - indicates contact sent this (the rest must be digits,
+                    # since content lines like "10 min away" also start with a 1)
+                    current_message.sender = 'contact'
+                    
+                elif line[0] == '(' and line.startswith(RECEIPT_LINE_PREFIXES):
+                    # Read receipt or delivery info - add to metadata
+                    if current_message.metadata is None:
+                        current_message.metadata = []
+                    current_message.metadata.append(line)
+                    
+                elif line in ME_SENDER_LINES:
+                    current_message.sender = 'me'
+                    
                 else:
-                    current_message['content'] = line
+                    # Content line
+                    current_message.content_parts.append(line)
         
         # Add the last message
-        if current_message.get('content'):
-            messages.append(current_message)
-        
-        # Convert timestamps to standardized format
-        for msg in messages:
-            try:
-                # Parse the timestamp and convert to ISO format
-                parsed_time = parse(msg['timestamp_raw'])
-                msg['timestamp'] = parsed_time.isoformat()
-                # Remove the raw timestamp since we have the standardized one
-                del msg['timestamp_raw']
-            except Exception:
-                # If parsing fails, keep the raw timestamp as the timestamp
-                msg['timestamp'] = msg['timestamp_raw']
-                del msg['timestamp_raw']
+        if current_message.content_parts:
+            messages.append(current_message.to_dict())
         
         return messages
         
@@ -843,22 +1155,16 @@ def consolidate_contact_messages(contact_name, phone_numbers, temp_export_dir):
     
     for phone_number in phone_numbers:
         # Find message file for this phone number
-        phone_clean = phone_number.replace('+', '')
-        possible_filenames = [
-            f"{phone_number}.txt",
-            f"{phone_clean}.txt"
-        ]
-        
-        for filename in possible_filenames:
-            file_path = os.path.join(temp_export_dir, filename)
-            if os.path.exists(file_path):
-                messages = parse_message_file_for_llm(file_path, phone_number)
-                all_messages.extend(messages)
-                phone_usage[phone_number] = len(messages)
-                break
+        file_path = find_message_file(phone_number, temp_export_dir)
+        if file_path:
+            messages = parse_message_file_for_llm(file_path, phone_number)
+            all_messages.extend(messages)
+            phone_usage[phone_number] = len(messages)
     
-    # Sort all messages chronologically
-    all_messages.sort(key=lambda x: x.get('timestamp', ''))
+    # Sort all messages chronologically. Each file's messages are already in order,
+    # and Timsort merges those presorted runs in C, so this is effectively a K-way merge.
+    # Parsed messages always have a timestamp, so a C-level itemgetter key is enough.
+    all_messages.sort(key=operator.itemgetter('timestamp'))
     
     return all_messages, phone_usage
 
@@ -875,77 +1181,39 @@ def create_consolidated_message_file(contact_name, phone_numbers, temp_export_di
     
     for phone_number in phone_numbers:
         # Find message file for this phone number
-        phone_clean = phone_number.replace('+', '')
-        possible_filenames = [
-            f"{phone_number}.txt",
-            f"{phone_clean}.txt"
-        ]
+        file_path = find_message_file(phone_number, temp_export_dir)
+        if file_path is None:
+            continue
         
-        for filename in possible_filenames:
-            file_path = os.path.join(temp_export_dir, filename)
-            if os.path.exists(file_path):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Parse but keep original format
-                    lines = content.split('\n')
-                    current_message_lines = []
-                    message_timestamp = None
-                    message_sender = None
-                    
-                    for line in lines:
-                        line_stripped = line.strip()
-                        if not line_stripped:
-                            if current_message_lines and message_timestamp:
-                                # Save current message
-                                all_raw_messages.append({
-                                    'timestamp_line': message_timestamp,
-                                    'sender_line': message_sender,
-                                    'content_lines': current_message_lines.copy(),
-                                    'phone_source': phone_number
-                                })
-                                current_message_lines = []
-                                message_timestamp = None
-                                message_sender = None
-                            continue
-                        
-                        # Check if line is a timestamp
-                        timestamp_patterns = [
-                            r'^(\w{3}\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)',
-                            r'^(\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)',
-                        ]
-                        
-                        is_timestamp = False
-                        for pattern in timestamp_patterns:
-                            if re.match(pattern, line_stripped):
-                                is_timestamp = True
-                                break
-                        
-                        if is_timestamp:
-                            # Save previous message if exists
-                            if current_message_lines and message_timestamp:
-                                all_raw_messages.append({
-                                    'timestamp_line': message_timestamp,
-                                    'sender_line': message_sender,
-                                    'content_lines': current_message_lines.copy(),
-                                    'phone_source': phone_number
-                                })
-                            
-                            # Start new message
-                            message_timestamp = line_stripped
-                            current_message_lines = []
-                            message_sender = None
-                            
-                        elif line_stripped in ['Me', 'me'] or line_stripped.startswith('+') or line_stripped.startswith('1'):
-                            # Sender line
-                            message_sender = line_stripped
-                            
-                        else:
-                            # Content line
-                            current_message_lines.append(line_stripped)
-                    
-                    # Add the last message
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # Parse but keep original format
+            lines = content.split('\n')
+            current_message_lines = []
+            message_timestamp = None
+            message_sender = None
+            
+            for line in lines:
+                line_stripped = line.strip()
+                if not line_stripped:
+                    if current_message_lines and message_timestamp:
+                        # Save current message
+                        all_raw_messages.append({
+                            'timestamp_line': message_timestamp,
+                            'sender_line': message_sender,
+                            'content_lines': current_message_lines.copy(),
+                            'phone_source': phone_number
+                        })
+                        current_message_lines = []
+                        message_timestamp = None
+                        message_sender = None
+                    continue
+                
+                # Check if line is a timestamp
+                if TIMESTAMP_LINE_PATTERN.match(line_stripped):
+                    # Save previous message if exists
                     if current_message_lines and message_timestamp:
                         all_raw_messages.append({
                             'timestamp_line': message_timestamp,
@@ -954,11 +1222,32 @@ def create_consolidated_message_file(contact_name, phone_numbers, temp_export_di
                             'phone_source': phone_number
                         })
                     
-                    phone_usage[phone_number] = len([m for m in all_raw_messages if m['phone_source'] == phone_number])
+                    # Start new message
+                    message_timestamp = line_stripped
+                    current_message_lines = []
+                    message_sender = None
+                    
+                elif (line_stripped[0] in '+1' and line_stripped[1:].isdigit()) or line_stripped in ME_SENDER_LINES:
+                    # Sender line (phone number or "Me")
+                    message_sender = line_stripped
                     
-                except Exception as e:
-                    print(f"  ! Error reading {file_path}: {str(e)}")
-                break
+                else:
+                    # Content line
+                    current_message_lines.append(line_stripped)
+            
+            # Add the last message
+            if current_message_lines and message_timestamp:
+                all_raw_messages.append({
+                    'timestamp_line': message_timestamp,
+                    'sender_line': message_sender,
+                    'content_lines': current_message_lines.copy(),
+                    'phone_source': phone_number
+                })
+            
+            phone_usage[phone_number] = len([m for m in all_raw_messages if m['phone_source'] == phone_number])
+            
+        except Exception as e:
+            print(f"  ! Error reading {file_path}: {str(e)}")
     
     if not all_raw_messages:
         print(f"  ! No messages found for {contact_name}")
@@ -967,8 +1256,8 @@ def create_consolidated_message_file(contact_name, phone_numbers, temp_export_di
     # Sort messages chronologically
     def parse_timestamp_for_sorting(timestamp_line):
         try:
-            from dateutil.parser import parse
-            return parse(timestamp_line)
+            # Sort on the timestamp itself - lines can carry a "(Read by ...)" suffix
+            return parse_timestamp(TIMESTAMP_LINE_PATTERN.match(timestamp_line).group(1))
         except:
             return datetime.min
     
@@ -1017,6 +1306,19 @@ def create_consolidated_message_file(contact_name, phone_numbers, temp_export_di
         print(f"  ! Error creating consolidated message file: {str(e)}")
         return None
 
+def finish_group_chat_message(message, content_parts):
+    """
+    Join a group chat message's content lines and convert its raw timestamp to ISO format
+    """
+    message['content'] = ' '.join(content_parts)
+    if 'timestamp_raw' in message:
+        timestamp_raw = message.pop('timestamp_raw')
+        try:
+            message['timestamp'] = parse_timestamp(timestamp_raw).isoformat()
+        except Exception:
+            message['timestamp'] = timestamp_raw
+    return message
+
 def parse_group_chat_file(file_path):
     """
     Parse a group chat message file to extract participants and messages
@@ -1030,34 +1332,27 @@ def parse_group_chat_file(file_path):
             lines = f.readlines()
         
         current_message = {}
+        content_parts = []  # Content lines of the current message, joined once when it's saved
         expecting_sender = False  # Flag to track if next line should be sender
         
         for line in lines:
             line = line.strip()
             if not line:
-                # Save current message if exists
-                if current_message.get('content'):
-                    messages.append(current_message.copy())
+                # Save current message if exists (a new dict replaces it, so no copy is needed)
+                if content_parts:
+                    messages.append(finish_group_chat_message(current_message, content_parts))
                     current_message = {}
+                    content_parts = []
                 expecting_sender = False
                 continue
             
             # Check for timestamp pattern
-            timestamp_patterns = [
-                r'^(\w{3}\s+\d{1,2},\s+\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)',
-                r'^(\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M)',
-            ]
-            
-            timestamp_match = None
-            for pattern in timestamp_patterns:
-                timestamp_match = re.match(pattern, line)
-                if timestamp_match:
-                    break
+            timestamp_match = TIMESTAMP_LINE_PATTERN.match(line)
             
             if timestamp_match:
                 # Save previous message if exists
-                if current_message.get('content'):
-                    messages.append(current_message.copy())
+                if content_parts:
+                    messages.append(finish_group_chat_message(current_message, content_parts))
                 
                 # Start new message
                 current_message = {
@@ -1065,25 +1360,28 @@ def parse_group_chat_file(file_path):
                     'content': '',
                     'sender': 'unknown'
                 }
+                content_parts = []
                 expecting_sender = True  # Next non-empty line should be the sender
                 
             elif expecting_sender:
                 # This line immediately follows a timestamp, so it's the sender
-                if line in ['Me', 'me']:
+                if line in ME_SENDER_LINES:
                     current_message['sender'] = 'me'
-                elif re.match(r'^\+\d{10,15}$', line) or re.match(r'^\d{10,15}$', line):
-                    # Phone number sender
-                    normalized_phone = normalize_phone_number(line)
+                elif PHONE_NUMBER_PATTERN.match(line):
+                    # Phone number sender (interned: every message from a participant
+                    # shares one string, and sender comparisons hit the identity fast path)
+                    normalized_phone = sys.intern(normalize_phone_number(line))
                     current_message['sender'] = normalized_phone
                     participants.add(normalized_phone)
                 elif '@' in line and '.' in line and len(line.split()) == 1:
                     # Email address sender
-                    current_message['sender'] = line
-                    participants.add(line)
+                    email_sender = sys.intern(line)
+                    current_message['sender'] = email_sender
+                    participants.add(email_sender)
                 else:
                     # Unknown sender format, treat as content
                     current_message['sender'] = 'unknown'
-                    current_message['content'] = line
+                    content_parts = [line]
                 
                 expecting_sender = False
                 
@@ -1093,26 +1391,11 @@ def parse_group_chat_file(file_path):
                 
             else:
                 # Content line
-                if current_message.get('content'):
-                    current_message['content'] += ' ' + line
-                else:
-                    current_message['content'] = line
+                content_parts.append(line)
         
         # Add the last message
-        if current_message.get('content'):
-            messages.append(current_message)
-        
-        # Convert timestamps to standardized format
-        for msg in messages:
-            try:
-                if 'timestamp_raw' in msg:
-                    parsed_time = parse(msg['timestamp_raw'])
-                    msg['timestamp'] = parsed_time.isoformat()
-                    del msg['timestamp_raw']
-            except Exception:
-                if 'timestamp_raw' in msg:
-                    msg['timestamp'] = msg['timestamp_raw']
-                    del msg['timestamp_raw']
+        if content_parts:
+            messages.append(finish_group_chat_message(current_message, content_parts))
         
         return {
             'messages': messages,
@@ -1156,8 +1439,8 @@ def create_group_chat_json(group_filename, group_data, group_folder):
     timestamps = [m.get('timestamp') for m in messages if m.get('timestamp')]
     if timestamps:
         try:
-            first_date = parse(min(timestamps))
-            last_date = parse(max(timestamps))
+            first_date = parse_timestamp(min(timestamps))
+            last_date = parse_timestamp(max(timestamps))
             date_range = f"{first_date.strftime('%Y-%m-%d')} to {last_date.strftime('%Y-%m-%d')}"
             conversation_span_days = (last_date - first_date).days
         except Exception:
@@ -1195,7 +1478,7 @@ def create_group_chat_json(group_filename, group_data, group_folder):
             "type": "group_chat_messages"
         }],
         "metadata": {
-            "generated_at": "2025-01-15T06:06:00Z",
+            "generated_at": get_generated_at(),
             "format": "group_chat_export_v1"
         }
     }
@@ -1205,8 +1488,7 @@ def create_group_chat_json(group_filename, group_data, group_folder):
     json_path = os.path.join(group_folder, json_filename)
     
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(group_json, f, indent=2, ensure_ascii=False)
+        write_json_file(json_path, group_json)
         
         print(f"  ✓ Created group chat JSON: {json_path}")
         return group_json
@@ -1228,10 +1510,13 @@ def process_group_chats(group_files, temp_export_dir, output_folder):
     group_chat_data = {}
     processed_count = 0
     
+    # Resolve group chat files from the export directory index instead of a stat per file
+    message_file_index = get_message_file_index(temp_export_dir)
+    
     for group_file in group_files:
-        group_file_path = os.path.join(temp_export_dir, group_file)
+        group_file_path = message_file_index.get(group_file)
         
-        if not os.path.exists(group_file_path):
+        if group_file_path is None:
             continue
         
         print(f"\n💬 Processing group: {group_file}")
@@ -1249,13 +1534,13 @@ def process_group_chats(group_files, temp_export_dir, output_folder):
         print(f"  ✅ Found {group_data['total_messages']} messages from {len(group_data['participants'])} participants")
         
         # Create a safe folder name for this group
-        safe_group_name = re.sub(r'[\\/*?:"<>|]', '_', group_file.replace('.txt', ''))
+        safe_group_name = group_file.replace('.txt', '').translate(UNSAFE_FILENAME_CHARS_TABLE)
         group_folder = os.path.join(group_chats_folder, safe_group_name)
         os.makedirs(group_folder, exist_ok=True)
         
-        # Copy the original message file
+        # Link (or copy) the original message file
         dest_path = os.path.join(group_folder, group_file)
-        shutil.copy2(group_file_path, dest_path)
+        link_or_copy_file(group_file_path, dest_path)
         
         # Create structured JSON
         group_json = create_group_chat_json(group_file, group_data, group_folder)
@@ -1278,7 +1563,7 @@ def process_group_chats(group_files, temp_export_dir, output_folder):
         summary_data = {
             "metadata": {
                 "total_group_chats": len(group_chat_data),
-                "generated_at": "2025-01-15T06:06:00Z",
+                "generated_at": get_generated_at(),
                 "format": "group_chat_summary_v1"
             },
             "group_chats": []
@@ -1293,8 +1578,7 @@ def process_group_chats(group_files, temp_export_dir, output_folder):
             })
         
         summary_path = os.path.join(group_chats_folder, 'group_chats_summary.json')
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary_data, f, indent=2, ensure_ascii=False)
+        write_json_file(summary_path, summary_data)
         
         print(f"  ✓ Created group chat summary: {summary_path}")
     
@@ -0,0 +1,81 @@
+"""
+JSON Utilities Module
+
+This module provides the JSON file reading and writing shared by the exporter modules.
+It uses orjson when it is installed and falls back to the standard library otherwise.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import orjson  # Optional: much faster serialization straight to UTF-8 bytes
+except ImportError:
+    orjson = None
+
+# Thread pool and pending writes while inside background_json_writes()
+_background_writer = None
+_background_writes = []
+
+
+def dumps_json(data):
+    """
+    Serialize data to UTF-8 JSON bytes with 2-space indentation
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def read_json_file(file_path):
+    """
+    Read and parse a JSON file (parsed straight from the raw bytes)
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def write_bytes_file(file_path, content):
+    """
+    Write already serialized bytes to a file (safe to run in a writer thread)
+    """
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+
+def write_json_file(file_path, data):
+    """
+    Write data to a UTF-8 JSON file with 2-space indentation
+    Inside background_json_writes() the file itself is written by a writer thread.
+    """
+    content = dumps_json(data)
+    if _background_writer is not None:
+        _background_writes.append(_background_writer.submit(write_bytes_file, file_path, content))
+    else:
+        write_bytes_file(file_path, content)
+
+
+@contextmanager
+def background_json_writes(max_workers):
+    """
+    Hand JSON file writes to a thread pool for the duration of the block, so disk
+    IO overlaps with further processing. Data is still serialized by the caller,
+    so it can be changed afterwards. All writes are finished (and the first write
+    error is raised) when the block exits.
+    """
+    global _background_writer
+    _background_writer = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield
+    finally:
+        writer, _background_writer = _background_writer, None
+        writer.shutdown(wait=True)
+        pending_writes = list(_background_writes)
+        _background_writes.clear()
+    
+    for pending_write in pending_writes:
+        pending_write.result()
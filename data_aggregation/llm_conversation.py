@@ -6,12 +6,15 @@ optimization, grouping, and cleaning for general AI processing.
 """
 
 import re
-import json
 import os
+import heapq
+from operator import itemgetter
 from datetime import datetime, timedelta
 from dateutil.parser import parse
 import emoji
 
+from json_utils import read_json_file, write_json_file
+
 # Import privacy functionality
 from privacy_handler import (
     ANONYMIZE_LLM_DATA,
@@ -24,6 +27,82 @@ from privacy_handler import (
     PRIVACY_MAPPING_FILE
 )
 
+# Precompiled patterns for emoji processing
+DUPLICATE_EMOJI_PATTERN = re.compile(r'(:[\w_-]+:)(\1)+')  # :heart::heart: -> :heart:
+LONG_EMOJI_PATTERN = re.compile(r':[\w_-]{15,}:')          # Very long emoji descriptions
+EMOJI_DESCRIPTION_PATTERN = re.compile(r':[\w_-]+:')       # Any remaining emoji description
+REPEATED_EMOJI_TAG_PATTERN = re.compile(r'\(emoji\)\s*\(emoji\)+')
+
+# Common emojis replaced with shorter, LLM-friendly text
+EMOJI_REPLACEMENTS = {
+    ':face_with_tears_of_joy:': '(laughing)',
+    ':red_heart:': '(heart)',
+    ':smiling_face_with_heart-eyes:': '(heart eyes)', 
+    ':thumbs_up:': '(thumbs up)',
+    ':thumbs_down:': '(thumbs down)',
+    ':fire:': '(fire)',
+    ':clapping_hands:': '(clapping)',
+    ':folded_hands:': '(praying)',
+    ':rolling_on_the_floor_laughing:': '(laughing)',
+    ':crying_face:': '(crying)',
+    ':smiling_face:': '',  # Remove simple smiles as they add little value
+    ':winking_face:': '',  # Remove simple winks
+    ':kissing_face:': '(kiss)',
+    ':thinking_face:': '(thinking)',
+    ':face_with_rolling_eyes:': '(eye roll)',
+    ':person_shrugging:': '(shrug)',
+    ':shrugging:': '(shrug)',
+    # Add some more common ones
+    ':grinning_face:': '',
+    ':beaming_face_with_smiling_eyes:': '',
+    ':star-struck:': '(amazed)',
+    ':partying_face:': '(party)'
+}
+
+# All replacement codes in one alternation so content is scanned once
+EMOJI_REPLACEMENT_PATTERN = re.compile('|'.join(re.escape(code) for code in EMOJI_REPLACEMENTS))
+
+# Read receipts, reply/reaction notices, tapbacks and bracketed system messages.
+# Applied in this order: removing one artifact can expose or break up another.
+# Each pattern is paired with a literal that any match must contain, so the
+# regex only runs when a plain substring check finds that literal.
+SYSTEM_ARTIFACT_PATTERNS = [
+    ('(Read by ', re.compile(r'\(Read by .+?\)')),                    # Read receipts
+    ('(Delivered', re.compile(r'\(Delivered.+?\)')),                  # Delivery receipts
+    ('This message responded', re.compile(r'This message responded to an earlier message\.?')),
+    ('Replied to "', re.compile(r'Replied to ".+?"')),
+    ('Reacted to "', re.compile(r'Reacted to ".+?" with .+')),
+    ('Emphasized "', re.compile(r'Emphasized ".+?"')),
+    ('Liked "', re.compile(r'Liked ".+?"')),
+    ('Loved "', re.compile(r'Loved ".+?"')),
+    ('Laughed at "', re.compile(r'Laughed at ".+?"')),
+    ('Questioned "', re.compile(r'Questioned ".+?"')),
+    ('Disliked "', re.compile(r'Disliked ".+?"')),
+    ('Tapback: ', re.compile(r'Tapback: .+')),                        # Tapback artifacts
+    ('[', re.compile(r'\[.+?\]')),                                    # Bracketed system messages
+]
+
+# One scan for any artifact literal, so clean messages skip the passes above
+SYSTEM_ARTIFACT_TRIGGER_PATTERN = re.compile(
+    '|'.join(re.escape(literal) for literal, _ in SYSTEM_ARTIFACT_PATTERNS)
+)
+
+# Very short messages that add nothing for the LLM
+SHORT_MEANINGLESS_MESSAGES = frozenset({
+    'ok', 'okay', 'k', 'kk', 'lol', 'haha', 'yeah', 'yes', 'no', 'np', 
+    'yep', 'nope', 'sure', 'cool', 'nice', 'alright', 'ty', 'thx', 'thanks',
+    'hmm', 'mhm', 'yup', 'nah', 'sup', 'hey', 'hi', 'hello', 'bye'
+})
+SHORT_MEANINGLESS_MAX_LENGTH = max(map(len, SHORT_MEANINGLESS_MESSAGES))  # Longer messages can't match (lower() never shortens)
+
+# Runs of repeated punctuation
+ELLIPSIS_RUN_PATTERN = re.compile(r'[.]{3,}')
+EXCLAMATION_RUN_PATTERN = re.compile(r'[!]{2,}')
+QUESTION_RUN_PATTERN = re.compile(r'[?]{2,}')
+
+# Characters replaced in contact folder names
+UNSAFE_FILENAME_CHARS_TABLE = str.maketrans(dict.fromkeys('\\/*?:"<>|', '_'))
+
 
 def process_emojis_for_llm(content):
     """
@@ -35,50 +114,32 @@ def process_emojis_for_llm(content):
     if not content:
         return content
     
-    # Convert emojis to text descriptions first
-    content = emoji.demojize(content, delimiters=(":", ":"))
-    
-    # Reduce consecutive duplicate emoji descriptions BEFORE replacements
-    # This handles cases like :heart::heart::heart: → :heart:
-    content = re.sub(r'(:[\w_-]+:)(\1)+', r'\1', content)
-    
-    # Replace common emojis with shorter, LLM-friendly text
-    emoji_replacements = {
-        ':face_with_tears_of_joy:': '(laughing)',
-        ':red_heart:': '(heart)',
-        ':smiling_face_with_heart-eyes:': '(heart eyes)', 
-        ':thumbs_up:': '(thumbs up)',
-        ':thumbs_down:': '(thumbs down)',
-        ':fire:': '(fire)',
-        ':clapping_hands:': '(clapping)',
-        ':folded_hands:': '(praying)',
-        ':rolling_on_the_floor_laughing:': '(laughing)',
-        ':crying_face:': '(crying)',
-        ':smiling_face:': '',  # Remove simple smiles as they add little value
-        ':winking_face:': '',  # Remove simple winks
-        ':kissing_face:': '(kiss)',
-        ':thinking_face:': '(thinking)',
-        ':face_with_rolling_eyes:': '(eye roll)',
-        ':person_shrugging:': '(shrug)',
-        ':shrugging:': '(shrug)',
-        # Add some more common ones
-        ':grinning_face:': '',
-        ':beaming_face_with_smiling_eyes:': '',
-        ':star-struck:': '(amazed)',
-        ':partying_face:': '(party)'
-    }
-    
-    for emoji_code, replacement in emoji_replacements.items():
-        content = content.replace(emoji_code, replacement)
-    
-    # For remaining complex emoji descriptions, be more selective
-    # Remove very long/complex emoji descriptions
-    content = re.sub(r':[\w_-]{15,}:', '', content)  # Remove very long emoji descriptions
-    # Convert remaining medium-length emojis to simple tag
-    content = re.sub(r':[\w_-]+:', '(emoji)', content)
+    # Convert emojis to text descriptions first (emojis are never ASCII, so plain
+    # ASCII text - most messages - can skip the emoji table scan)
+    if not content.isascii():
+        content = emoji.demojize(content, delimiters=(":", ":"))
+    
+    # Emoji descriptions are colon-delimited, so without a colon there's nothing to replace
+    if ':' in content:
+        # Reduce consecutive duplicate emoji descriptions BEFORE replacements
+        # This handles cases like :heart::heart::heart: → :heart:
+        # A repeat always has a '::' where one description ends and the next begins,
+        # so the backreference pattern only runs when one is present
+        if '::' in content:
+            content = DUPLICATE_EMOJI_PATTERN.sub(r'\1', content)
+        
+        # Replace common emojis with shorter, LLM-friendly text
+        content = EMOJI_REPLACEMENT_PATTERN.sub(lambda m: EMOJI_REPLACEMENTS[m.group(0)], content)
+        
+        # For remaining complex emoji descriptions, be more selective
+        # Remove very long/complex emoji descriptions
+        content = LONG_EMOJI_PATTERN.sub('', content)  # Remove very long emoji descriptions
+        # Convert remaining medium-length emojis to simple tag
+        content = EMOJI_DESCRIPTION_PATTERN.sub('(emoji)', content)
     
     # Clean up multiple consecutive (emoji) tags
-    content = re.sub(r'\(emoji\)\s*\(emoji\)+', '(emoji)', content)
+    if '(emoji)' in content:
+        content = REPEATED_EMOJI_TAG_PATTERN.sub('(emoji)', content)
     
     # Remove standalone (emoji) that don't add value
     if content.strip() == '(emoji)':
@@ -97,70 +158,71 @@ def clean_message_content(content):
     if not content or not isinstance(content, str):
         return ""
     
-    # Remove excessive whitespace and normalize
-    content = ' '.join(content.split())
-    
-    # Process emojis for LLM optimization
+    # Process emojis for LLM optimization (this also normalizes whitespace)
     content = process_emojis_for_llm(content)
     
-    # Remove read receipt and delivery artifacts
-    content = re.sub(r'\(Read by .+?\)', '', content)
-    content = re.sub(r'\(Delivered.+?\)', '', content)
-    
-    # Remove system messages about replies and reactions
-    content = re.sub(r'This message responded to an earlier message\.?', '', content)
-    content = re.sub(r'Replied to ".+?"', '', content)
-    content = re.sub(r'Reacted to ".+?" with .+', '', content)
-    content = re.sub(r'Emphasized ".+?"', '', content)
-    content = re.sub(r'Liked ".+?"', '', content)
-    content = re.sub(r'Loved ".+?"', '', content)
-    content = re.sub(r'Laughed at ".+?"', '', content)
-    content = re.sub(r'Questioned ".+?"', '', content)
-    content = re.sub(r'Disliked ".+?"', '', content)
-    
-    # Remove tapback artifacts
-    content = re.sub(r'Tapback: .+', '', content)
-    
-    # Remove other system messages
-    content = re.sub(r'\[.+?\]', '', content)  # Remove bracketed system messages
+    # Remove read receipts, reply/reaction notices, tapbacks and bracketed system messages
+    if SYSTEM_ARTIFACT_TRIGGER_PATTERN.search(content):
+        for literal, pattern in SYSTEM_ARTIFACT_PATTERNS:
+            if literal in content:
+                content = pattern.sub('', content)
     
     # Clean up multiple spaces again after removals
     content = ' '.join(content.split())
     
-    # Remove very short meaningless messages
-    short_meaningless = {
-        'ok', 'okay', 'k', 'kk', 'lol', 'haha', 'yeah', 'yes', 'no', 'np', 
-        'yep', 'nope', 'sure', 'cool', 'nice', 'alright', 'ty', 'thx', 'thanks',
-        'hmm', 'mhm', 'yup', 'nah', 'sup', 'hey', 'hi', 'hello', 'bye'
-    }
-    
-    if content.lower().strip() in short_meaningless:
+    # Remove very short meaningless messages (content is already stripped by the join above)
+    if len(content) <= SHORT_MEANINGLESS_MAX_LENGTH and content.lower() in SHORT_MEANINGLESS_MESSAGES:
         return ""
     
     # Remove if it's just emojis or very short
-    if len(content.strip()) <= 2:
+    if len(content) <= 2:
         return ""
     
     # Remove excessive punctuation
-    content = re.sub(r'[.]{3,}', '...', content)
-    content = re.sub(r'[!]{2,}', '!', content)
-    content = re.sub(r'[?]{2,}', '?', content)
+    content = ELLIPSIS_RUN_PATTERN.sub('...', content)
+    content = EXCLAMATION_RUN_PATTERN.sub('!', content)
+    content = QUESTION_RUN_PATTERN.sub('?', content)
     
-    return content.strip()
+    return content
 
 
-def should_start_new_group(prev_timestamp, curr_timestamp, time_window_minutes):
+def parse_iso_timestamp(value):
     """
-    Determine if we should start a new message group based on time gap
+    Parse a message timestamp, which is stored as an ISO string once the message
+    file has been read. Uses the fast datetime.fromisoformat and only falls back
+    to dateutil for anything else. Raises like dateutil if nothing matches.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return parse(value)
+
+
+def get_message_time(message):
+    """
+    Get a message's time as a datetime, reusing the one parsed when the message
+    file was read ('_ts') instead of parsing the timestamp string again.
+    Returns None if the timestamp can't be parsed.
+    """
+    message_time = message.get('_ts')
+    if message_time is None:
+        try:
+            message_time = parse_iso_timestamp(message.get('timestamp', ''))
+        except Exception:
+            return None
+    return message_time
+
+
+def should_start_new_group(prev_time, curr_time, time_window_minutes):
+    """
+    Determine if we should start a new message group based on the time gap
+    between two message datetimes (None if a time is unknown)
     """
     try:
-        prev_time = parse(prev_timestamp)
-        curr_time = parse(curr_timestamp)
-        
         time_diff = curr_time - prev_time
         return time_diff > timedelta(minutes=time_window_minutes)
     except Exception:
-        # If we can't parse timestamps, start new group to be safe
+        # If we can't compare the times, start new group to be safe
         return True
 
 
@@ -175,11 +237,13 @@ def is_content_similar(content1, content2, similarity_threshold=0.8):
     if len(shorter) == 0:
         return False
     
-    # If the shorter text is mostly contained in the longer text
-    if shorter in longer and len(shorter) / len(longer) > similarity_threshold:
-        return True
+    # Compare lengths first: it's O(1), while the substring search scans the
+    # longer text (which grows with the message group)
+    if len(shorter) / len(longer) <= similarity_threshold:
+        return False
     
-    return False
+    # If the shorter text is mostly contained in the longer text
+    return shorter in longer
 
 
 def group_consecutive_messages(messages, time_window_minutes=10):
@@ -191,6 +255,9 @@ def group_consecutive_messages(messages, time_window_minutes=10):
     
     grouped_messages = []
     current_group = None
+    current_group_time = None  # Time of the group's first message
+    current_group_parts = []  # Content pieces of the current group, joined once when it's saved
+    current_group_lower = ''  # Lowercased group content, extended as messages are added
     
     for message in messages:
         # Clean the content first
@@ -202,14 +269,16 @@ def group_consecutive_messages(messages, time_window_minutes=10):
         
         sender = message.get('sender', 'unknown')
         timestamp = message.get('timestamp', '')
+        message_time = get_message_time(message)
         
         # If this is the first message or different sender, start new group
         if (current_group is None or 
             current_group['sender'] != sender or 
-            should_start_new_group(current_group['timestamp'], timestamp, time_window_minutes)):
+            should_start_new_group(current_group_time, message_time, time_window_minutes)):
             
             # Save previous group if it exists
             if current_group:
+                current_group['content'] = ' '.join(current_group_parts)
                 grouped_messages.append(current_group)
             
             # Start new group
@@ -218,18 +287,23 @@ def group_consecutive_messages(messages, time_window_minutes=10):
                 'sender': sender,
                 'content': cleaned_content
             }
+            current_group_time = message_time
+            current_group_parts = [cleaned_content]
+            current_group_lower = cleaned_content.lower()
         else:
-            # Check for duplication before adding to current group
-            existing_content = current_group['content'].lower()
+            # Check for duplication before adding to current group. The group's lowercased
+            # content is kept up to date instead of lowercasing the whole group each time.
             new_content = cleaned_content.lower()
             
             # Only add if it's not a duplicate or very similar
-            if (new_content not in existing_content and 
-                not is_content_similar(existing_content, new_content)):
-                current_group['content'] += ' ' + cleaned_content
+            if (new_content not in current_group_lower and 
+                not is_content_similar(current_group_lower, new_content)):
+                current_group_parts.append(cleaned_content)
+                current_group_lower += ' ' + new_content
     
     # Add the last group
     if current_group:
+        current_group['content'] = ' '.join(current_group_parts)
         grouped_messages.append(current_group)
     
     return grouped_messages
@@ -259,18 +333,26 @@ def generate_conversation_metadata(messages, contact_data):
     if not messages:
         return {}
     
-    # Basic stats
+    # Basic stats and the earliest timestamp, collected in a single pass
     total_messages = len(messages)
-    sent_messages = sum(1 for m in messages if m.get('sender') == 'me')
-    received_messages = sum(1 for m in messages if m.get('sender') == 'contact')
+    sent_messages = 0
+    received_messages = 0
+    first_message = None
+    for m in messages:
+        sender = m.get('sender')
+        if sender == 'me':
+            sent_messages += 1
+        elif sender == 'contact':
+            received_messages += 1
+        
+        timestamp = m.get('timestamp')
+        if timestamp and (first_message is None or timestamp < first_message):
+            first_message = timestamp
     
     # Date range
-    timestamps = [m.get('timestamp') for m in messages if m.get('timestamp')]
-    if timestamps:
-        first_message = min(timestamps)
-        
+    if first_message is not None:
         try:
-            first_date = parse(first_message)
+            first_date = parse_iso_timestamp(first_message)
             current_date = datetime.now()
             conversation_span_days = (current_date - first_date).days
             
@@ -303,13 +385,29 @@ def generate_conversation_metadata(messages, contact_data):
     return metadata
 
 
-def create_llm_conversation_file(contact_name, contact_data, messages, output_folder):
+def prepare_llm_conversation(messages, contact_data):
     """
-    Create an LLM-ready conversation file for a single contact
+    Optimize messages and generate conversation metadata for an LLM conversation file
+    Depends only on its arguments, so it can run in a worker process
     """
     # Apply LLM optimizations: grouping, cleaning, filtering
     optimized_messages = optimize_messages_for_llm(messages)
     
+    # Generate conversation metadata (use optimized messages for stats)
+    conversation_metadata = generate_conversation_metadata(optimized_messages, contact_data)
+    
+    return optimized_messages, conversation_metadata
+
+
+def create_llm_conversation_file(contact_name, contact_data, messages, output_folder, prepared_conversation=None):
+    """
+    Create an LLM-ready conversation file for a single contact
+    prepared_conversation is the result of prepare_llm_conversation if it was already computed
+    """
+    if prepared_conversation is None:
+        prepared_conversation = prepare_llm_conversation(messages, contact_data)
+    optimized_messages, conversation_metadata = prepared_conversation
+    
     # Extract contact information
     contact_info = {
         "name": contact_name,
@@ -326,9 +424,6 @@ def create_llm_conversation_file(contact_name, contact_data, messages, output_fo
     if 'title' in contact_data:
         contact_info['title'] = contact_data['title']
     
-    # Generate conversation metadata (use optimized messages for stats)
-    conversation_metadata = generate_conversation_metadata(optimized_messages, contact_data)
-    
     # Create the LLM-ready structure
     llm_data = {
         "contact": contact_info,
@@ -340,18 +435,16 @@ def create_llm_conversation_file(contact_name, contact_data, messages, output_fo
     anonymized_data, privacy_mapping = anonymize_data_for_llm(llm_data, contact_name)
     
     # Save inside the contact's folder instead of separate _llm_ready folder
-    safe_name = re.sub(r'[\\/*?:"<>|]', '_', contact_name)
+    safe_name = contact_name.translate(UNSAFE_FILENAME_CHARS_TABLE)
     contact_folder = os.path.join(output_folder, safe_name)
     llm_file_path = os.path.join(contact_folder, 'conversation_llm.json')
     
-    with open(llm_file_path, 'w', encoding='utf-8') as f:
-        json.dump(anonymized_data if ANONYMIZE_LLM_DATA else llm_data, f, indent=2, ensure_ascii=False)
+    write_json_file(llm_file_path, anonymized_data if ANONYMIZE_LLM_DATA else llm_data)
     
     # Save privacy mapping if anonymization was applied
     if ANONYMIZE_LLM_DATA and privacy_mapping:
         mapping_file_path = os.path.join(contact_folder, 'privacy_mapping.json')
-        with open(mapping_file_path, 'w', encoding='utf-8') as f:
-            json.dump(privacy_mapping, f, indent=2, ensure_ascii=False)
+        write_json_file(mapping_file_path, privacy_mapping)
     
     return llm_file_path, conversation_metadata
 
@@ -400,19 +493,19 @@ def create_llm_master_files(llm_conversations_data, output_folder, min_message_c
         "mappings": {}
     }
     
-    # Overall statistics
-    total_messages = 0
-    total_sent = 0
-    total_received = 0
     most_active_contacts = []
     
-    for contact_name, data in sorted(llm_conversations_data.items()):
+    # Contact names are unique, so sorting just the names gives the same order as sorting the items
+    for contact_name in sorted(llm_conversations_data):
+        data = llm_conversations_data[contact_name]
         file_path = data['file_path']
         recent_file_path = data.get('recent_file_path')
         metadata = data['metadata']
         interaction_analysis = data.get('interaction_analysis', {})
         
         index_name = get_person_placeholder(contact_name) if ANONYMIZE_LLM_DATA else contact_name
+        # Placeholder for the first (most active) phone number, used by both the index and the summary
+        first_phone_placeholder = get_phone_placeholder(contact_name, 1) if ANONYMIZE_LLM_DATA else None
         
         # Add to master index
         index_entry = {
@@ -435,9 +528,7 @@ def create_llm_master_files(llm_conversations_data, output_folder, min_message_c
         if ANONYMIZE_LLM_DATA:
             # Use placeholders for phone numbers
             if 'phone_numbers' in data:
-                anonymized_phones = []
-                for i, _ in enumerate(data['phone_numbers']):
-                    anonymized_phones.append(get_phone_placeholder(contact_name, i+1))
+                anonymized_phones = [get_phone_placeholder(contact_name, i+1) for i in range(len(data['phone_numbers']))]
                 index_entry['phone_numbers'] = anonymized_phones
             
             # Use placeholders for emails if present
@@ -449,7 +540,7 @@ def create_llm_master_files(llm_conversations_data, output_folder, min_message_c
             
             # Use placeholder for most active number
             if metadata.get('most_active_number'):
-                index_entry['most_active_number'] = get_phone_placeholder(contact_name, 1)
+                index_entry['most_active_number'] = first_phone_placeholder
         else:
             # Use real data
             if 'phone_numbers' in data:
@@ -473,13 +564,17 @@ def create_llm_master_files(llm_conversations_data, output_folder, min_message_c
         
         # Anonymize metadata for summary if needed
         if ANONYMIZE_LLM_DATA:
-            anonymized_metadata = json.loads(json.dumps(metadata))
+            # Shallow copy is enough: phone_number_usage (the only nested value) is replaced below
+            anonymized_metadata = dict(metadata)
             if 'most_active_number' in anonymized_metadata:
-                anonymized_metadata['most_active_number'] = get_phone_placeholder(contact_name, 1)
+                anonymized_metadata['most_active_number'] = first_phone_placeholder
             if 'phone_number_usage' in anonymized_metadata:
+                # Reuse the index entry's phone placeholders where they were already built
+                known_placeholders = anonymized_phones if 'phone_numbers' in data else []
                 phone_usage = {}
-                for i, (_, count) in enumerate(anonymized_metadata['phone_number_usage'].items()):
-                    phone_usage[get_phone_placeholder(contact_name, i+1)] = count
+                for i, count in enumerate(anonymized_metadata['phone_number_usage'].values()):
+                    placeholder = known_placeholders[i] if i < len(known_placeholders) else get_phone_placeholder(contact_name, i+1)
+                    phone_usage[placeholder] = count
                 anonymized_metadata['phone_number_usage'] = phone_usage
             summary_entry["conversation_metadata"] = anonymized_metadata
             summary_entry["interaction_analysis"] = interaction_analysis  # Interaction analysis doesn't need anonymization
@@ -492,30 +587,26 @@ def create_llm_master_files(llm_conversations_data, output_folder, min_message_c
         # Store privacy mapping in master file
         if ANONYMIZE_LLM_DATA:
             # Check for individual privacy mapping file
-            safe_name = re.sub(r'[\\/*?:"<>|]', '_', contact_name)
+            safe_name = contact_name.translate(UNSAFE_FILENAME_CHARS_TABLE)
             mapping_file_path = os.path.join(output_folder, safe_name, 'privacy_mapping.json')
             
-            if os.path.exists(mapping_file_path):
-                try:
-                    with open(mapping_file_path, 'r', encoding='utf-8') as f:
-                        mapping_data = json.load(f)
-                        all_privacy_mappings["mappings"][contact_name] = mapping_data
-                except Exception as e:
-                    print(f"  ! Error reading privacy mapping for {contact_name}: {str(e)}")
-        
-        # Update overall stats
-        msg_count = metadata.get('total_messages', 0)
-        total_messages += msg_count
-        total_sent += metadata.get('sent_messages', 0)
-        total_received += metadata.get('received_messages', 0)
+            try:
+                all_privacy_mappings["mappings"][contact_name] = read_json_file(mapping_file_path)
+            except FileNotFoundError:
+                pass  # No mapping was saved for this contact
+            except Exception as e:
+                print(f"  ! Error reading privacy mapping for {contact_name}: {str(e)}")
         
         most_active_contacts.append({
             "name": index_name if ANONYMIZE_LLM_DATA else contact_name,
-            "message_count": msg_count
+            "message_count": metadata.get('total_messages', 0)
         })
     
-    # Sort by most active
-    most_active_contacts.sort(key=lambda x: x['message_count'], reverse=True)
+    # Overall statistics
+    all_metadata = [data['metadata'] for data in llm_conversations_data.values()]
+    total_messages = sum(metadata.get('total_messages', 0) for metadata in all_metadata)
+    total_sent = sum(metadata.get('sent_messages', 0) for metadata in all_metadata)
+    total_received = sum(metadata.get('received_messages', 0) for metadata in all_metadata)
     
     # Add overall statistics to metadata
     master_index["metadata"]["overall_stats"] = {
@@ -523,22 +614,20 @@ def create_llm_master_files(llm_conversations_data, output_folder, min_message_c
         "total_sent_messages": total_sent,
         "total_received_messages": total_received,
         "average_messages_per_conversation": round(total_messages / len(llm_conversations_data), 1) if llm_conversations_data else 0,
-        "most_active_contacts": most_active_contacts[:10]  # Top 10
+        # Top 10 by message count (a partial sort, same order as a full stable sort)
+        "most_active_contacts": heapq.nlargest(10, most_active_contacts, key=itemgetter('message_count'))
     }
     
     # Write files
     master_index_path = os.path.join(llm_folder, "master_index.json")
-    with open(master_index_path, 'w', encoding='utf-8') as f:
-        json.dump(master_index, f, indent=2, ensure_ascii=False)
+    write_json_file(master_index_path, master_index)
     
     summaries_path = os.path.join(llm_folder, "conversation_summaries.json")
-    with open(summaries_path, 'w', encoding='utf-8') as f:
-        json.dump(conversation_summaries, f, indent=2, ensure_ascii=False)
+    write_json_file(summaries_path, conversation_summaries)
     
     # Write the master privacy mapping file if anonymization is enabled
     if ANONYMIZE_LLM_DATA:
         mapping_path = os.path.join(llm_folder, PRIVACY_MAPPING_FILE)
-        with open(mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(all_privacy_mappings, f, indent=2, ensure_ascii=False)
+        write_json_file(mapping_path, all_privacy_mappings)
     
     return master_index_path, summaries_path 
\ No newline at end of file
@@ -5,7 +5,6 @@ This module orchestrates both main LLM conversation processing and recent intera
 analysis, providing a unified interface for the contacts exporter.
 """
 
-import re
 import os
 from datetime import datetime
 
@@ -17,35 +16,73 @@ from privacy_handler import (
     RECENT_INTERACTIONS_FILENAME
 )
 from llm_conversation import (
+    prepare_llm_conversation,
     create_llm_conversation_file,
     create_llm_master_files,
     optimize_messages_for_llm,
-    generate_conversation_metadata
+    generate_conversation_metadata,
+    UNSAFE_FILENAME_CHARS_TABLE
 )
 from recent_interactions import (
+    prepare_recent_interactions,
     create_recent_interactions_file
 )
 
 
-def create_llm_files_for_contact(contact_name, contact_data, messages, output_folder):
+def get_llm_contact_data(phone_numbers, vcard, phone_usage):
+    """
+    Extract the contact context used in the LLM files from a vCard
+    """
+    contact_data = {'phone_numbers': phone_numbers, 'phone_usage': phone_usage}
+    
+    if hasattr(vcard, 'email'):
+        contact_data['emails'] = [{'address': email.value} for email in vcard.email_list]
+    
+    if hasattr(vcard, 'org'):
+        contact_data['organization'] = vcard.org.value[0]
+    
+    if hasattr(vcard, 'title'):
+        contact_data['title'] = vcard.title.value
+    
+    return contact_data
+
+
+def prepare_llm_content(contact_data, messages):
+    """
+    Do the cleaning, grouping and analysis for both LLM files of a contact.
+    This is the CPU-heavy part and depends only on its arguments, so it can run
+    in a worker process. Anonymizing and writing the files stays in the main
+    process because privacy placeholder IDs are assigned in processing order.
+    """
+    return {
+        'conversation': prepare_llm_conversation(messages, contact_data),
+        'recent_interactions': prepare_recent_interactions(messages)
+    }
+
+
+def create_llm_files_for_contact(contact_name, contact_data, messages, output_folder, prepared_content=None):
     """
     Create both LLM conversation files for a single contact:
     1. Main LLM conversation file (optimized)
     2. Recent interactions file (preserved formatting)
     
+    prepared_content is the result of prepare_llm_content if it was already computed.
     Returns a unified result structure for the master index.
     """
     if not messages:
         return None, None
     
+    if prepared_content is None:
+        prepared_content = prepare_llm_content(contact_data, messages)
+    
     # Create main LLM conversation file
     llm_file_path, conversation_metadata = create_llm_conversation_file(
-        contact_name, contact_data, messages, output_folder
+        contact_name, contact_data, messages, output_folder, prepared_content['conversation']
     )
     
     # Create recent interactions file
     recent_file_path, interaction_analysis = create_recent_interactions_file(
-        contact_name, contact_data, messages, output_folder
+        contact_name, contact_data, messages, output_folder, prepared_content['recent_interactions']
     )
     
     # Return unified result structure
@@ -59,40 +96,30 @@ def create_llm_files_for_contact(contact_name, contact_data, messages, output_fo
     return result_data
 
 
-def process_contact_for_llm_files(contact_name, phone_numbers, vcard, temp_export_dir, output_folder, 
-                                  consolidate_contact_messages_func):
+def process_contact_for_llm_files(contact_name, phone_numbers, vcard, output_folder, messages, phone_usage,
+                                  prepared_content=None):
     """
     Process a single contact for both LLM file types
-    This function is designed to be called from contacts_exporter.py
+    This function is designed to be called from contacts_exporter.py with the
+    contact's already consolidated messages and per-phone message counts, and
+    optionally the prepare_llm_content result computed in a worker process
     """
-    # Get consolidated messages
-    messages, phone_usage = consolidate_contact_messages_func(contact_name, phone_numbers, temp_export_dir)
-    
     if not messages:
         return None, None
     
     # Extract contact data from vcard for context
-    contact_data = {'phone_numbers': phone_numbers, 'phone_usage': phone_usage}
-    
-    if hasattr(vcard, 'email'):
-        contact_data['emails'] = [{'address': email.value} for email in vcard.email_list]
-    
-    if hasattr(vcard, 'org'):
-        contact_data['organization'] = vcard.org.value[0]
-    
-    if hasattr(vcard, 'title'):
-        contact_data['title'] = vcard.title.value
+    contact_data = get_llm_contact_data(phone_numbers, vcard, phone_usage)
     
     # Create both LLM files
     llm_result = create_llm_files_for_contact(
-        contact_name, contact_data, messages, output_folder
+        contact_name, contact_data, messages, output_folder, prepared_content
     )
     
     if not llm_result:
         return None, None
     
     # Return data for master index with updated file paths
-    safe_contact_name = re.sub(r'[\\/*?:"<>|]', '_', contact_name)
+    safe_contact_name = contact_name.translate(UNSAFE_FILENAME_CHARS_TABLE)
     llm_data = {
         'file_path': f"{safe_contact_name}/conversation_llm.json",
         'recent_file_path': f"{safe_contact_name}/{RECENT_INTERACTIONS_FILENAME}",
@@ -116,6 +143,8 @@ __all__ = [
     'create_llm_master_files',
     'optimize_messages_for_llm',
     'generate_conversation_metadata',
+    'get_llm_contact_data',
+    'prepare_llm_content',
     'create_llm_files_for_contact',
     'process_contact_for_llm_files',
     'ANONYMIZE_LLM_DATA',
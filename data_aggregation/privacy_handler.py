@@ -6,7 +6,7 @@ It provides name/phone/email anonymization and privacy mapping functionality.
 """
 
 import re
-import json
+import copy
 import os
 from datetime import datetime
 
@@ -38,6 +38,9 @@ _social_media_to_id = {}  # Maps social media handles to social IDs
 _address_id_counter = 0
 _address_to_id = {}  # Maps addresses to address IDs
 
+# Keys holding message lists (main conversation and recent interactions files)
+MESSAGE_LIST_KEYS = ("messages", "recent_messages")
+
 # Regex patterns for sensitive data detection
 EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
 PARTIAL_EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\b'  # Catches partial emails like user@gmail
@@ -79,6 +82,21 @@ PASSWORD_PATTERNS = [
     r'the\s+password\s+(?:is|:)\s+([A-Za-z0-9!@#$%^&*()_+\-=\[\]{}|;:,.<>?]{6,})',  # "the password is X"
 ]
 
+# Every pattern in the lists above contains one of these keywords (keep them in sync),
+# so a single search lets messages without any skip the per-pattern scans
+USERNAME_CONTEXT_KEYWORD_PATTERN = re.compile(
+    r'(?:github|gh|twitter|instagram|ig|linkedin|facebook|discord|telegram|username)\s', re.IGNORECASE
+)
+PASSWORD_KEYWORD_PATTERN = re.compile(r'passw[o0]rd|pwd|credentials|login', re.IGNORECASE)
+
+# The patterns above compiled once, since they're applied to every message
+EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+PARTIAL_EMAIL_REGEX = re.compile(PARTIAL_EMAIL_PATTERN)
+PHONE_REGEX = re.compile(PHONE_PATTERN)
+SOCIAL_MEDIA_REGEXES = [re.compile(pattern) for pattern in SOCIAL_MEDIA_PATTERNS]
+USERNAME_CONTEXT_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in USERNAME_CONTEXT_PATTERNS]
+PASSWORD_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in PASSWORD_PATTERNS]
+
 
 def set_privacy_enabled(enabled):
     """Set whether privacy features are enabled globally."""
@@ -227,6 +245,19 @@ def reset_person_mapping():
     _address_to_id = {}
 
 
+def get_or_create_phone_placeholder(mapping, phone_placeholders, contact_name, phone):
+    """
+    Get the placeholder a phone number already has in the mapping, or add the next one.
+    phone_placeholders is the reverse index of mapping["phones"] (phone -> first placeholder).
+    """
+    placeholder = phone_placeholders.get(phone)
+    if placeholder is None:
+        placeholder = get_phone_placeholder(contact_name, len(mapping['phones'])+1)
+        mapping["phones"][placeholder] = phone
+        phone_placeholders[phone] = placeholder
+    return placeholder
+
+
 def anonymize_data_for_llm(data, contact_name):
     """
     Anonymize sensitive data for LLM processing while maintaining a mapping for restoration
@@ -248,26 +279,44 @@ def anonymize_data_for_llm(data, contact_name):
         "original_data": {}
     }
     
-    # Create a copy of the data to modify
-    anonymized = json.loads(json.dumps(data))
+    # Reverse indexes of mapping["phones"] and mapping["emails"] (value -> first placeholder),
+    # so finding the placeholder of a known value doesn't scan the whole mapping
+    phone_placeholders = {}
+    email_placeholders = {}
+    
+    # Create a copy of the data to modify. Message lists are the bulk of the data and only
+    # each message's content is replaced, so messages are copied one level deep instead
+    anonymized = {
+        key: [dict(msg) for msg in value] if key in MESSAGE_LIST_KEYS else copy.deepcopy(value)
+        for key, value in data.items()
+    }
     
     # Extract first name for more comprehensive replacement
     # This handles cases where only the first name is used in messages
     first_name = contact_name.split()[0] if contact_name else ""
     
+    # Patterns for the contact's name, compiled once for all of its messages
+    person_placeholder = get_person_placeholder(contact_name)
+    contact_name_pattern = re.compile(re.escape(contact_name), re.IGNORECASE)
+    first_name_pattern = None
+    if first_name and first_name != contact_name and len(first_name) > 1:
+        # Match the first name as a whole word to avoid replacing partial matches
+        first_name_pattern = re.compile(r'\b' + re.escape(first_name) + r'\b', re.IGNORECASE)
+    
     # Anonymize contact information
     if "contact" in anonymized:
         # Save original contact info
-        mapping["original_data"]["contact"] = json.loads(json.dumps(anonymized["contact"]))
+        mapping["original_data"]["contact"] = copy.deepcopy(anonymized["contact"])
         
         # Replace contact name with placeholder
-        anonymized["contact"]["name"] = get_person_placeholder(contact_name)
+        anonymized["contact"]["name"] = person_placeholder
         
         # Create unique placeholders for each phone number
         if "phone_numbers" in anonymized["contact"]:
             for i, phone in enumerate(anonymized["contact"]["phone_numbers"]):
                 placeholder = get_phone_placeholder(contact_name, i+1)
                 mapping["phones"][placeholder] = phone
+                phone_placeholders.setdefault(phone, placeholder)
                 anonymized["contact"]["phone_numbers"][i] = placeholder
         
         # Create unique placeholders for each email
@@ -275,6 +324,7 @@ def anonymize_data_for_llm(data, contact_name):
             for i, email in enumerate(anonymized["contact"]["emails"]):
                 placeholder = get_email_placeholder(contact_name, i+1)
                 mapping["emails"][placeholder] = email
+                email_placeholders.setdefault(email, placeholder)
                 anonymized["contact"]["emails"][i] = placeholder
         
         # Anonymize organization if present
@@ -293,22 +343,13 @@ def anonymize_data_for_llm(data, contact_name):
     # Anonymize phone numbers in conversation metadata
     if "conversation_metadata" in anonymized:
         # Save original metadata
-        mapping["original_data"]["metadata"] = json.loads(json.dumps(anonymized["conversation_metadata"]))
+        mapping["original_data"]["metadata"] = copy.deepcopy(anonymized["conversation_metadata"])
         
         # Replace phone numbers in metadata
         if "most_active_number" in anonymized["conversation_metadata"]:
             phone = anonymized["conversation_metadata"]["most_active_number"]
             # Find or create placeholder for this phone
-            placeholder = None
-            for ph_placeholder, ph_value in mapping["phones"].items():
-                if ph_value == phone:
-                    placeholder = ph_placeholder
-                    break
-                    
-            if not placeholder:
-                placeholder = get_phone_placeholder(contact_name, len(mapping['phones'])+1)
-                mapping["phones"][placeholder] = phone
-                
+            placeholder = get_or_create_phone_placeholder(mapping, phone_placeholders, contact_name, phone)
             anonymized["conversation_metadata"]["most_active_number"] = placeholder
         
         # Replace phone numbers in phone_number_usage
@@ -316,23 +357,13 @@ def anonymize_data_for_llm(data, contact_name):
             phone_usage = {}
             for phone, count in anonymized["conversation_metadata"]["phone_number_usage"].items():
                 # Find or create placeholder for this phone
-                placeholder = None
-                for ph_placeholder, ph_value in mapping["phones"].items():
-                    if ph_value == phone:
-                        placeholder = ph_placeholder
-                        break
-                        
-                if not placeholder:
-                    placeholder = get_phone_placeholder(contact_name, len(mapping['phones'])+1)
-                    mapping["phones"][placeholder] = phone
-                    
+                placeholder = get_or_create_phone_placeholder(mapping, phone_placeholders, contact_name, phone)
                 phone_usage[placeholder] = count
                 
             anonymized["conversation_metadata"]["phone_number_usage"] = phone_usage
     
     # Anonymize message content (works for both main messages and recent_messages)
-    message_keys = ["messages", "recent_messages"]
-    for msg_key in message_keys:
+    for msg_key in MESSAGE_LIST_KEYS:
         if msg_key in anonymized:
             # Replace sensitive information in message content with placeholders
             for msg in anonymized[msg_key]:
@@ -340,14 +371,11 @@ def anonymize_data_for_llm(data, contact_name):
                     content = msg["content"]
                     
                     # Replace the full contact name with placeholder (case-insensitive)
-                    content = re.sub(re.escape(contact_name), get_person_placeholder(contact_name), content, flags=re.IGNORECASE)
+                    content = contact_name_pattern.sub(person_placeholder, content)
                     
                     # Replace just the first name if it's different from the full name
-                    # Use word boundary to avoid replacing partial matches
-                    if first_name and first_name != contact_name and len(first_name) > 1:
-                        # Create pattern that matches the first name as a whole word (case-insensitive)
-                        pattern = r'\b' + re.escape(first_name) + r'\b'
-                        content = re.sub(pattern, get_person_placeholder(contact_name), content, flags=re.IGNORECASE)
+                    if first_name_pattern is not None:
+                        content = first_name_pattern.sub(person_placeholder, content)
                     
                     # Replace organization names in content if present
                     for org_placeholder, org_value in mapping["organizations"].items():
@@ -363,99 +391,95 @@ def anonymize_data_for_llm(data, contact_name):
                         content = content.replace(email, placeholder)
                     
                     # Find and replace additional phone numbers in content using regex
-                    phone_matches = re.findall(PHONE_PATTERN, content)
+                    phone_matches = PHONE_REGEX.findall(content)
                     for phone_match in phone_matches:
-                        # Check if we already have this phone in our mapping
-                        existing = False
-                        for _, phone in mapping["phones"].items():
-                            if phone_match in phone:
-                                existing = True
-                                break
+                        # Check if we already have this phone (or a number containing it) in our mapping
+                        existing = phone_match in phone_placeholders or any(
+                            phone_match in phone for phone in mapping["phones"].values()
+                        )
                         
                         if not existing:
                             placeholder = get_phone_placeholder(contact_name, len(mapping['phones'])+1)
                             mapping["phones"][placeholder] = phone_match
+                            phone_placeholders[phone_match] = placeholder
                             content = content.replace(phone_match, placeholder)
                     
-                    # Find and replace additional emails in content using regex
-                    email_matches = re.findall(EMAIL_PATTERN, content)
-                    for email_match in email_matches:
-                        # Check if we already have this email in our mapping
-                        existing = False
-                        for _, email in mapping["emails"].items():
-                            if email_match == email:
-                                existing = True
-                                break
-                        
-                        if not existing:
-                            placeholder = get_email_placeholder(contact_name, len(mapping['emails'])+1)
-                            mapping["emails"][placeholder] = email_match
-                            content = content.replace(email_match, placeholder)
+                    # Find and replace additional emails in content using regex (both email
+                    # patterns need an '@', so messages without one skip the scans)
+                    if '@' in content:
+                        email_matches = EMAIL_REGEX.findall(content)
+                        for email_match in email_matches:
+                            # Check if we already have this email in our mapping
+                            if email_match not in email_placeholders:
+                                placeholder = get_email_placeholder(contact_name, len(mapping['emails'])+1)
+                                mapping["emails"][placeholder] = email_match
+                                email_placeholders[email_match] = placeholder
+                                content = content.replace(email_match, placeholder)
                     
-                    # Find and replace partial emails (like user@gmail without .com)
-                    partial_email_matches = re.findall(PARTIAL_EMAIL_PATTERN, content)
-                    for partial_email_match in partial_email_matches:
-                        # Skip if this was already handled by the full email pattern
-                        already_handled = False
-                        for _, email in mapping["emails"].items():
-                            if partial_email_match in email:
-                                already_handled = True
-                                break
-                        
-                        if not already_handled:
-                            placeholder = get_email_placeholder(contact_name, len(mapping['emails'])+1)
-                            mapping["emails"][placeholder] = partial_email_match
-                            content = content.replace(partial_email_match, placeholder)
+                    # Find and replace partial emails (like user@gmail without .com),
+                    # unless replacing the full emails left no '@' behind
+                    if '@' in content:
+                        partial_email_matches = PARTIAL_EMAIL_REGEX.findall(content)
+                        for partial_email_match in partial_email_matches:
+                            # Skip if this was already handled by the full email pattern
+                            already_handled = partial_email_match in email_placeholders or any(
+                                partial_email_match in email for email in mapping["emails"].values()
+                            )
+                            
+                            if not already_handled:
+                                placeholder = get_email_placeholder(contact_name, len(mapping['emails'])+1)
+                                mapping["emails"][placeholder] = partial_email_match
+                                email_placeholders[partial_email_match] = placeholder
+                                content = content.replace(partial_email_match, placeholder)
                     
-                    # Find and replace social media handles/links
-                    for pattern in SOCIAL_MEDIA_PATTERNS:
-                        social_matches = re.findall(pattern, content)
-                        for social_match in social_matches:
-                            full_match = re.search(f"({pattern})", content)
-                            if full_match:
-                                full_text = full_match.group(0)
-                                placeholder = get_social_media_placeholder(social_match)
-                                mapping["social_media"][placeholder] = full_text
-                                content = content.replace(full_text, placeholder)
+                    # Find and replace social media handles/links (every pattern needs a
+                    # ".com/" link or an "@", so most messages skip the per-pattern scans)
+                    if '.com/' in content or '@' in content:
+                        for pattern in SOCIAL_MEDIA_REGEXES:
+                            social_matches = pattern.findall(content)
+                            for social_match in social_matches:
+                                full_match = pattern.search(content)
+                                if full_match:
+                                    full_text = full_match.group(0)
+                                    placeholder = get_social_media_placeholder(social_match)
+                                    mapping["social_media"][placeholder] = full_text
+                                    content = content.replace(full_text, placeholder)
                     
                     # Find and replace directly mentioned usernames using enhanced patterns
-                    for pattern in USERNAME_CONTEXT_PATTERNS:
-                        try:
-                            username_matches = re.findall(pattern, content, re.IGNORECASE)
-                            for username in username_matches:
-                                if username:
-                                    # Get unique placeholder for this username
-                                    placeholder = get_social_media_placeholder(username)
-                                    mapping["social_media"][placeholder] = username
-                                    
-                                    # Create the regex to find the exact match including context
-                                    context_pattern = pattern.replace("([A-Za-z0-9", "([A-Za-z0-9")  # Ensure we match the same pattern
-                                    match_with_context = re.search(context_pattern, content, re.IGNORECASE)
-                                    
-                                    if match_with_context:
-                                        full_match = match_with_context.group(0)
-                                        replacement = full_match.replace(username, placeholder)
-                                        content = content.replace(full_match, replacement)
-                        except Exception as e:
-                            # If there's an error with a particular pattern, continue with other patterns
-                            print(f"  ! Error with pattern {pattern}: {str(e)}")
-                            continue
+                    if USERNAME_CONTEXT_KEYWORD_PATTERN.search(content):
+                        for pattern in USERNAME_CONTEXT_REGEXES:
+                            try:
+                                username_matches = pattern.findall(content)
+                                for username in username_matches:
+                                    if username:
+                                        # Get unique placeholder for this username
+                                        placeholder = get_social_media_placeholder(username)
+                                        mapping["social_media"][placeholder] = username
+                                        
+                                        # Find the exact match including context
+                                        match_with_context = pattern.search(content)
+                                        
+                                        if match_with_context:
+                                            full_match = match_with_context.group(0)
+                                            replacement = full_match.replace(username, placeholder)
+                                            content = content.replace(full_match, replacement)
+                            except Exception as e:
+                                # If there's an error with a particular pattern, continue with other patterns
+                                print(f"  ! Error with pattern {pattern.pattern}: {str(e)}")
+                                continue
                     
                     # Find and replace passwords and credentials
-                    for pattern in PASSWORD_PATTERNS:
-                        password_matches = re.findall(pattern, content, re.IGNORECASE)
-                        for pwd_match in password_matches:
-                            # Don't store the password itself in the mapping to enhance security
-                            # Just store a note that a password was found at this location
-                            cred_key = f"{PASSWORD_PLACEHOLDER}_{len(mapping['credentials'])+1}"
-                            mapping["credentials"][cred_key] = "Password redacted for security"
-                            
-                            # Replace the exact password match with a placeholder
-                            content = re.sub(
-                                f"({re.escape(pwd_match)})", 
-                                PASSWORD_PLACEHOLDER, 
-                                content
-                            )
+                    if PASSWORD_KEYWORD_PATTERN.search(content):
+                        for pattern in PASSWORD_REGEXES:
+                            password_matches = pattern.findall(content)
+                            for pwd_match in password_matches:
+                                # Don't store the password itself in the mapping to enhance security
+                                # Just store a note that a password was found at this location
+                                cred_key = f"{PASSWORD_PLACEHOLDER}_{len(mapping['credentials'])+1}"
+                                mapping["credentials"][cred_key] = "Password redacted for security"
+                                
+                                # Replace the exact password match with a placeholder
+                                content = content.replace(pwd_match, PASSWORD_PLACEHOLDER)
                     
                     # Update the message content
                     msg["content"] = content
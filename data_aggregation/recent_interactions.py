@@ -5,11 +5,16 @@ This module handles the creation of recent interactions files that focus on
 communication pattern analysis with preserved formatting and minimal cleaning.
 """
 
-import re
-import json
 import os
 from datetime import datetime
-from dateutil.parser import parse
+
+from json_utils import write_json_file
+from llm_conversation import (
+    SYSTEM_ARTIFACT_PATTERNS,
+    SYSTEM_ARTIFACT_TRIGGER_PATTERN,
+    UNSAFE_FILENAME_CHARS_TABLE,
+    parse_iso_timestamp
+)
 
 # Import privacy functionality
 from privacy_handler import (
@@ -28,28 +33,17 @@ def clean_message_content_minimal(content):
     if not content or not isinstance(content, str):
         return ""
     
-    # Only remove system artifacts that don't represent actual communication
-    content = re.sub(r'\(Read by .+?\)', '', content)  # Read receipts
-    content = re.sub(r'\(Delivered.+?\)', '', content)  # Delivery receipts
-    
-    # Remove system messages about replies and reactions (these aren't the actual messages)
-    content = re.sub(r'This message responded to an earlier message\.?', '', content)
-    content = re.sub(r'Replied to ".+?"', '', content)
-    content = re.sub(r'Reacted to ".+?" with .+', '', content)
-    content = re.sub(r'Emphasized ".+?"', '', content)
-    content = re.sub(r'Liked ".+?"', '', content)
-    content = re.sub(r'Loved ".+?"', '', content)
-    content = re.sub(r'Laughed at ".+?"', '', content)
-    content = re.sub(r'Questioned ".+?"', '', content)
-    content = re.sub(r'Disliked ".+?"', '', content)
-    content = re.sub(r'Tapback: .+', '', content)
-    
-    # Remove bracketed system messages but keep everything else
-    content = re.sub(r'\[.+?\]', '', content)
+    # Only remove system artifacts that don't represent actual communication: read/delivery
+    # receipts, reply and reaction notices, tapbacks and bracketed system messages. These are
+    # the same precompiled patterns clean_message_content uses, applied in the same order.
+    if SYSTEM_ARTIFACT_TRIGGER_PATTERN.search(content):
+        for literal, pattern in SYSTEM_ARTIFACT_PATTERNS:
+            if literal in content:
+                content = pattern.sub('', content)
     
     # Normalize excessive whitespace but preserve intentional formatting
-    content = re.sub(r'\s+', ' ', content)  # Multiple spaces/newlines -> single space
-    content = content.strip()
+    # (multiple spaces/newlines -> single space, ends stripped)
+    content = ' '.join(content.split())
     
     # Keep the message even if very short - in recent interactions, "ok" or "yes" matters for pattern analysis
     return content
@@ -122,8 +116,8 @@ def analyze_interaction_patterns(messages):
     timestamps = [m.get('timestamp') for m in messages if m.get('timestamp')]
     if timestamps:
         try:
-            first_recent = parse(timestamps[0])
-            last_recent = parse(timestamps[-1])
+            first_recent = parse_iso_timestamp(timestamps[0])
+            last_recent = parse_iso_timestamp(timestamps[-1])
             timespan_hours = (last_recent - first_recent).total_seconds() / 3600
         except Exception:
             timespan_hours = 0
@@ -144,22 +138,35 @@ def analyze_interaction_patterns(messages):
     return analysis
 
 
-def create_recent_interactions_file(contact_name, contact_data, messages, output_folder):
+def prepare_recent_interactions(messages):
+    """
+    Extract and analyze the recent interactions for a recent interactions file
+    Depends only on its arguments, so it can run in a worker process
+    """
+    # Extract recent interactions with minimal processing
+    recent_interactions = extract_recent_interactions(messages)
+    
+    # Analyze interaction patterns
+    interaction_analysis = analyze_interaction_patterns(recent_interactions)
+    
+    return recent_interactions, interaction_analysis
+
+
+def create_recent_interactions_file(contact_name, contact_data, messages, output_folder, prepared_interactions=None):
     """
     Create a recent interactions file focusing on communication patterns with preserved formatting
+    prepared_interactions is the result of prepare_recent_interactions if it was already computed
     """
     if not messages:
         return None, None
     
-    # Extract recent interactions with minimal processing
-    recent_interactions = extract_recent_interactions(messages)
+    if prepared_interactions is None:
+        prepared_interactions = prepare_recent_interactions(messages)
+    recent_interactions, interaction_analysis = prepared_interactions
     
     if not recent_interactions:
         return None, None
     
-    # Analyze interaction patterns
-    interaction_analysis = analyze_interaction_patterns(recent_interactions)
-    
     # Extract contact information (same as main LLM file)
     contact_info = {
         "name": contact_name,
@@ -194,11 +201,10 @@ def create_recent_interactions_file(contact_name, contact_data, messages, output
     anonymized_data, privacy_mapping = anonymize_data_for_llm(recent_interactions_data, contact_name)
     
     # Save the recent interactions file
-    safe_name = re.sub(r'[\\/*?:"<>|]', '_', contact_name)
+    safe_name = contact_name.translate(UNSAFE_FILENAME_CHARS_TABLE)
     contact_folder = os.path.join(output_folder, safe_name)
     recent_file_path = os.path.join(contact_folder, RECENT_INTERACTIONS_FILENAME)
     
-    with open(recent_file_path, 'w', encoding='utf-8') as f:
-        json.dump(anonymized_data if ANONYMIZE_LLM_DATA else recent_interactions_data, f, indent=2, ensure_ascii=False)
+    write_json_file(recent_file_path, anonymized_data if ANONYMIZE_LLM_DATA else recent_interactions_data)
     
     return recent_file_path, interaction_analysis 
\ No newline at end of file
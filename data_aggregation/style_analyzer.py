@@ -11,6 +11,23 @@ import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from json_utils import read_json_file
+
+# Characters replaced in contact folder names (same as the exporter)
+UNSAFE_FILENAME_CHARS_TABLE = str.maketrans(dict.fromkeys('\\/*?:"<>|', '_'))
+RECENT_INTERACTIONS_FILENAME = 'conversation_recent_interactions.json'  # Per-contact input file (same as the exporter)
+
+# Patterns used by the style analysis, compiled once instead of on every call
+ALL_CAPS_WORD_PATTERN = re.compile(r'\b[A-Z]{2,}\b')
+EMOJI_PATTERN = re.compile(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000026FF\U00002700-\U000027BF]')
+MULTIPLE_PUNCTUATION_PATTERN = re.compile(r'[!?]{2,}')
+REPEATED_LETTER_PATTERN = re.compile(r'([a-zA-Z])\1{2,}')
+WORD_PATTERN = re.compile(r'\b\w+\b')
+ABBREVIATION_PATTERN = re.compile(r'\b(lol|omg|btw|tbh|nvm|idk|imo|fyi|asap|ttyl|brb|wtf|smh|irl|dm|rn|af|fr|ngl)\b')
+SLANG_PATTERN = re.compile(r'\b(gonna|wanna|gotta|kinda|sorta|yeah|yep|nah|sup|hey|yo|dude|bro|sis|bestie|lowkey|highkey|deadass|facts|bet)\b')
 
 
 class MessageStyleAnalyzer:
@@ -21,6 +38,8 @@ class MessageStyleAnalyzer:
         self.data = recent_interactions_data
         self.user_messages = self._extract_user_messages()
         self.all_messages = recent_interactions_data.get('recent_messages', [])
+        self._counters = None  # Per-message feature counts, collected on first use
+        self._lowercase_text = None  # All user messages joined and lowercased, built on first use
         
     def _extract_user_messages(self) -> List[str]:
         """Extract all messages sent by the user ('me') from recent interactions."""
@@ -32,17 +51,31 @@ class MessageStyleAnalyzer:
         if not self.user_messages:
             return self._empty_analysis()
         
+        # The recommendations are based on these sections, so they're computed once and shared
+        basic_stats = self._analyze_basic_stats()
+        formatting = self._analyze_formatting()
+        language = self._analyze_language()
+        
         return {
-            'basic_stats': self._analyze_basic_stats(),
-            'formatting_patterns': self._analyze_formatting(),
-            'language_patterns': self._analyze_language(),
+            'basic_stats': basic_stats,
+            'formatting_patterns': formatting,
+            'language_patterns': language,
             'emotional_patterns': self._analyze_emotional_style(),
             'response_patterns': self._analyze_response_patterns(),
             'timing_patterns': self._analyze_timing(),
             'examples': self._get_representative_examples(),
-            'recommendations': self._generate_style_recommendations()
+            'recommendations': self._generate_style_recommendations(basic_stats, formatting, language)
         }
     
+    def get_style_recommendations(self) -> List[str]:
+        """Get only the AI message generation recommendations, without the other analysis sections."""
+        if not self.user_messages:
+            return []
+        
+        return self._generate_style_recommendations(
+            self._analyze_basic_stats(), self._analyze_formatting(), self._analyze_language()
+        )
+    
     def _empty_analysis(self) -> Dict[str, Any]:
         """Return empty analysis when no user messages are available."""
         return {
@@ -56,17 +89,106 @@ class MessageStyleAnalyzer:
             'recommendations': []
         }
     
+    def _get_message_counters(self) -> Dict[str, Any]:
+        """Count the per-message features of the user's messages in a single pass (cached)."""
+        if self._counters is not None:
+            return self._counters
+        
+        lengths = [len(msg) for msg in self.user_messages]
+        total_words = 0
+        starts_capital = all_caps_messages = ends_with_punct = ellipsis = enthusiastic = 0
+        single_word = short_msgs = long_msgs = 0
+        uses_multiple_punctuation = uses_repeated_letters = False
+        uses_asterisks = uses_parentheses = uses_multiple_spaces = uses_line_breaks = False
+        
+        for msg in self.user_messages:
+            word_count = len(msg.split())
+            total_words += word_count
+            if word_count == 1:
+                single_word += 1
+            if word_count <= 3:
+                short_msgs += 1
+            elif word_count > 10:
+                long_msgs += 1
+            
+            if msg:
+                if msg[0].isupper():
+                    starts_capital += 1
+                if msg[-1] in '.!?':
+                    ends_with_punct += 1
+            if ALL_CAPS_WORD_PATTERN.search(msg):
+                all_caps_messages += 1
+            
+            if '...' in msg:
+                ellipsis += 1
+            
+            # Enthusiasm: an exclamation, or "excited"/"amazing" in any case (lowercased at most once)
+            if '!' in msg:
+                enthusiastic += 1
+            else:
+                lowered = msg.lower()
+                if 'excited' in lowered or 'amazing' in lowered:
+                    enthusiastic += 1
+            
+            # Yes/no features only need one message that has them
+            if not uses_multiple_punctuation and MULTIPLE_PUNCTUATION_PATTERN.search(msg):
+                uses_multiple_punctuation = True
+            if not uses_repeated_letters and REPEATED_LETTER_PATTERN.search(msg):
+                uses_repeated_letters = True
+            uses_asterisks = uses_asterisks or '*' in msg
+            uses_parentheses = uses_parentheses or ('(' in msg and ')' in msg)
+            uses_multiple_spaces = uses_multiple_spaces or '  ' in msg
+            uses_line_breaks = uses_line_breaks or '\n' in msg
+        
+        # Single characters can't span message boundaries, so they're counted in one
+        # scan over all messages instead of one count() call per message
+        all_text = ''.join(self.user_messages)
+        
+        self._counters = {
+            'total_chars': sum(lengths),
+            'total_words': total_words,
+            'shortest': min(lengths),
+            'longest': max(lengths),
+            'starts_capital': starts_capital,
+            'all_caps_messages': all_caps_messages,
+            'ends_with_punct': ends_with_punct,
+            'periods': all_text.count('.'),
+            'exclamations': all_text.count('!'),
+            'questions': all_text.count('?'),
+            'commas': all_text.count(','),
+            'ellipsis': ellipsis,
+            'enthusiastic': enthusiastic,
+            'spaces': all_text.count(' '),
+            'single_word': single_word,
+            'short_msgs': short_msgs,
+            'long_msgs': long_msgs,
+            'uses_multiple_punctuation': uses_multiple_punctuation,
+            'uses_repeated_letters': uses_repeated_letters,
+            'uses_asterisks': uses_asterisks,
+            'uses_parentheses': uses_parentheses,
+            'uses_multiple_spaces': uses_multiple_spaces,
+            'uses_line_breaks': uses_line_breaks
+        }
+        return self._counters
+    
+    def _get_lowercase_text(self) -> str:
+        """Get all user messages joined with spaces and lowercased (cached)."""
+        if self._lowercase_text is None:
+            self._lowercase_text = ' '.join(self.user_messages).lower()
+        return self._lowercase_text
+    
     def _analyze_basic_stats(self) -> Dict[str, Any]:
         """Analyze basic message statistics."""
-        total_chars = sum(len(msg) for msg in self.user_messages)
-        total_words = sum(len(msg.split()) for msg in self.user_messages)
+        counters = self._get_message_counters()
+        total_chars = counters['total_chars']
+        total_words = counters['total_words']
         
         return {
             'message_count': len(self.user_messages),
             'average_length': round(total_chars / len(self.user_messages)),
             'average_words': round(total_words / len(self.user_messages), 1),
-            'shortest_message': min(len(msg) for msg in self.user_messages),
-            'longest_message': max(len(msg) for msg in self.user_messages),
+            'shortest_message': counters['shortest'],
+            'longest_message': counters['longest'],
             'total_characters': total_chars,
             'total_words': total_words
         }
@@ -85,8 +207,9 @@ class MessageStyleAnalyzer:
     
     def _analyze_capitalization(self) -> Dict[str, Any]:
         """Analyze capitalization patterns."""
-        starts_capital = sum(1 for msg in self.user_messages if msg and msg[0].isupper())
-        all_caps_words = sum(1 for msg in self.user_messages if re.search(r'\b[A-Z]{2,}\b', msg))
+        counters = self._get_message_counters()
+        starts_capital = counters['starts_capital']
+        all_caps_words = counters['all_caps_messages']
         
         return {
             'starts_capital_ratio': round(starts_capital / len(self.user_messages), 2),
@@ -108,15 +231,16 @@ class MessageStyleAnalyzer:
     
     def _analyze_punctuation(self) -> Dict[str, Any]:
         """Analyze punctuation usage patterns."""
+        counters = self._get_message_counters()
         punct_counts = {
-            'periods': sum(msg.count('.') for msg in self.user_messages),
-            'exclamations': sum(msg.count('!') for msg in self.user_messages),
-            'questions': sum(msg.count('?') for msg in self.user_messages),
-            'commas': sum(msg.count(',') for msg in self.user_messages),
-            'ellipsis': sum(1 for msg in self.user_messages if '...' in msg)
+            'periods': counters['periods'],
+            'exclamations': counters['exclamations'],
+            'questions': counters['questions'],
+            'commas': counters['commas'],
+            'ellipsis': counters['ellipsis']
         }
         
-        ends_with_punct = sum(1 for msg in self.user_messages if msg and msg[-1] in '.!?')
+        ends_with_punct = counters['ends_with_punct']
         
         return {
             **punct_counts,
@@ -139,12 +263,10 @@ class MessageStyleAnalyzer:
     
     def _analyze_emojis(self) -> Dict[str, Any]:
         """Analyze emoji usage patterns."""
-        emoji_pattern = re.compile(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000026FF\U00002700-\U000027BF]')
-        
-        messages_with_emojis = [msg for msg in self.user_messages if emoji_pattern.search(msg)]
-        all_emojis = []
-        for msg in self.user_messages:
-            all_emojis.extend(emoji_pattern.findall(msg))
+        # The pattern matches single characters, so one scan over all messages finds the
+        # same emojis in the same order, and messages only need checking if there are any
+        all_emojis = EMOJI_PATTERN.findall(''.join(self.user_messages))
+        messages_with_emojis = [msg for msg in self.user_messages if EMOJI_PATTERN.search(msg)] if all_emojis else []
         
         emoji_freq = Counter(all_emojis)
         
@@ -170,26 +292,29 @@ class MessageStyleAnalyzer:
     
     def _analyze_special_characters(self) -> Dict[str, Any]:
         """Analyze usage of special characters."""
+        counters = self._get_message_counters()
         return {
-            'uses_multiple_punctuation': sum(1 for msg in self.user_messages if re.search(r'[!?]{2,}', msg)) > 0,
-            'uses_repeated_letters': sum(1 for msg in self.user_messages if re.search(r'([a-zA-Z])\1{2,}', msg)) > 0,
-            'uses_asterisks': sum(1 for msg in self.user_messages if '*' in msg) > 0,
-            'uses_parentheses': sum(1 for msg in self.user_messages if '(' in msg and ')' in msg) > 0
+            'uses_multiple_punctuation': counters['uses_multiple_punctuation'],
+            'uses_repeated_letters': counters['uses_repeated_letters'],
+            'uses_asterisks': counters['uses_asterisks'],
+            'uses_parentheses': counters['uses_parentheses']
         }
     
     def _analyze_spacing(self) -> Dict[str, Any]:
         """Analyze spacing patterns."""
+        counters = self._get_message_counters()
         return {
-            'uses_multiple_spaces': sum(1 for msg in self.user_messages if '  ' in msg) > 0,
-            'uses_line_breaks': sum(1 for msg in self.user_messages if '\n' in msg) > 0,
-            'average_spaces_per_message': round(sum(msg.count(' ') for msg in self.user_messages) / len(self.user_messages), 1)
+            'uses_multiple_spaces': counters['uses_multiple_spaces'],
+            'uses_line_breaks': counters['uses_line_breaks'],
+            'average_spaces_per_message': round(counters['spaces'] / len(self.user_messages), 1)
         }
     
     def _analyze_message_structure(self) -> Dict[str, Any]:
         """Analyze message structure patterns."""
-        single_word = sum(1 for msg in self.user_messages if len(msg.split()) == 1)
-        short_msgs = sum(1 for msg in self.user_messages if len(msg.split()) <= 3)
-        long_msgs = sum(1 for msg in self.user_messages if len(msg.split()) > 10)
+        counters = self._get_message_counters()
+        single_word = counters['single_word']
+        short_msgs = counters['short_msgs']
+        long_msgs = counters['long_msgs']
         
         return {
             'single_word_ratio': round(single_word / len(self.user_messages), 2),
@@ -200,22 +325,23 @@ class MessageStyleAnalyzer:
     
     def _analyze_language(self) -> Dict[str, Any]:
         """Analyze language patterns and vocabulary."""
-        all_text = ' '.join(self.user_messages).lower()
-        words = re.findall(r'\b\w+\b', all_text)
+        all_text = self._get_lowercase_text()
+        words = WORD_PATTERN.findall(all_text)
+        word_counts = Counter(words)  # Also gives the unique words, so no separate set is built
         
         # Common abbreviations and slang
-        abbreviations = re.findall(r'\b(lol|omg|btw|tbh|nvm|idk|imo|fyi|asap|ttyl|brb|wtf|smh|irl|dm|rn|af|fr|ngl)\b', all_text)
-        slang = re.findall(r'\b(gonna|wanna|gotta|kinda|sorta|yeah|yep|nah|sup|hey|yo|dude|bro|sis|bestie|lowkey|highkey|deadass|facts|bet)\b', all_text)
+        abbreviations = ABBREVIATION_PATTERN.findall(all_text)
+        slang = SLANG_PATTERN.findall(all_text)
         
         return {
             'total_words': len(words),
-            'unique_words': len(set(words)),
-            'vocabulary_richness': round(len(set(words)) / len(words), 2) if words else 0,
+            'unique_words': len(word_counts),
+            'vocabulary_richness': round(len(word_counts) / len(words), 2) if words else 0,
             'uses_abbreviations': len(abbreviations) > 0,
             'abbreviation_frequency': round(len(abbreviations) / len(words), 3) if words else 0,
             'uses_slang': len(slang) > 0,
             'slang_frequency': round(len(slang) / len(words), 3) if words else 0,
-            'most_common_words': Counter(words).most_common(10)
+            'most_common_words': word_counts.most_common(10)
         }
     
     def _analyze_emotional_style(self) -> Dict[str, Any]:
@@ -224,11 +350,11 @@ class MessageStyleAnalyzer:
         positive_words = ['good', 'great', 'awesome', 'cool', 'nice', 'love', 'like', 'happy', 'fun', 'yes', 'yeah']
         negative_words = ['bad', 'hate', 'no', 'nah', 'sucks', 'terrible', 'awful', 'annoying', 'sad', 'mad']
         
-        all_text = ' '.join(self.user_messages).lower()
+        all_text = self._get_lowercase_text()
         positive_count = sum(all_text.count(word) for word in positive_words)
         negative_count = sum(all_text.count(word) for word in negative_words)
         
-        enthusiasm_indicators = sum(1 for msg in self.user_messages if '!' in msg or 'excited' in msg.lower() or 'amazing' in msg.lower())
+        enthusiasm_indicators = self._get_message_counters()['enthusiastic']
         
         return {
             'positive_indicators': positive_count,
@@ -253,21 +379,18 @@ class MessageStyleAnalyzer:
         if not self.all_messages:
             return {}
         
-        user_response_times = []
         user_initiations = 0
-        
-        for i, msg in enumerate(self.all_messages):
-            if msg.get('sender') == 'me':
-                if i == 0 or self.all_messages[i-1].get('sender') != 'me':
-                    # This is either the first message or a response/initiation
-                    if i == 0 or self.all_messages[i-1].get('sender') == 'contact':
-                        # This is a response
-                        pass
-                    else:
-                        # This is an initiation
-                        user_initiations += 1
-        
-        user_messages_count = sum(1 for msg in self.all_messages if msg.get('sender') == 'me')
+        user_messages_count = 0
+        previous_sender = 'contact'  # The first message counts as a response
+        
+        for msg in self.all_messages:
+            sender = msg.get('sender')
+            if sender == 'me':
+                user_messages_count += 1
+                # Following the contact is a response; following anyone else (not the user) is an initiation
+                if previous_sender != 'me' and previous_sender != 'contact':
+                    user_initiations += 1
+            previous_sender = sender
         
         return {
             'initiation_ratio': round(user_initiations / user_messages_count, 2) if user_messages_count > 0 else 0,
@@ -301,22 +424,20 @@ class MessageStyleAnalyzer:
         # Add 2-3 most recent messages
         examples.extend(self.user_messages[-2:])
         
-        return list(set(examples))[:5]  # Remove duplicates and limit to 5
+        return list(dict.fromkeys(examples))[:5]  # Remove duplicates (keeping the order above) and limit to 5
     
-    def _generate_style_recommendations(self) -> List[str]:
-        """Generate recommendations for AI message generation."""
+    def _generate_style_recommendations(self, stats: Dict[str, Any], formatting: Dict[str, Any],
+                                        language: Dict[str, Any]) -> List[str]:
+        """Generate recommendations for AI message generation from the analyzed sections."""
         recommendations = []
         
         # Basic stats analysis
-        stats = self._analyze_basic_stats()
         if stats['average_length'] < 20:
             recommendations.append("Keep messages short and concise")
         elif stats['average_length'] > 100:
             recommendations.append("User tends to write longer, more detailed messages")
         
         # Formatting analysis
-        formatting = self._analyze_formatting()
-        
         if formatting['capitalization']['capital_style'] == 'rare':
             recommendations.append("Use minimal capitalization, even at sentence starts")
         elif formatting['capitalization']['capital_style'] == 'consistent':
@@ -333,7 +454,6 @@ class MessageStyleAnalyzer:
             recommendations.append("Avoid using emojis")
         
         # Language analysis
-        language = self._analyze_language()
         if language['uses_abbreviations']:
             recommendations.append("Use common text abbreviations like 'lol', 'btw', etc.")
         if language['uses_slang']:
@@ -354,30 +474,62 @@ def analyze_contact_style(contact_name: str, data_folder: str = "data") -> Optio
         Style analysis dictionary or None if file not found
     """
     # Sanitize contact name for file path
-    safe_name = re.sub(r'[\\/*?:"<>|]', '_', contact_name)
+    safe_name = contact_name.translate(UNSAFE_FILENAME_CHARS_TABLE)
     contact_dir = os.path.join(data_folder, safe_name)
-    recent_interactions_path = os.path.join(contact_dir, 'conversation_recent_interactions.json')
-    
-    if not os.path.exists(recent_interactions_path):
-        return None
+    recent_interactions_path = os.path.join(contact_dir, RECENT_INTERACTIONS_FILENAME)
     
     try:
-        with open(recent_interactions_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json_file(recent_interactions_path)
         
         analyzer = MessageStyleAnalyzer(data)
         return analyzer.get_comprehensive_style_analysis()
         
+    except FileNotFoundError:
+        return None
     except Exception as e:
         print(f"Error analyzing style for {contact_name}: {str(e)}")
         return None
 
 
+def analyze_all_contacts(data_folder: str = "data", max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze the messaging style of every contact that has a recent interactions file.
+    Contacts are independent, so they're analyzed in parallel worker processes.
+    
+    Args:
+        data_folder: Path to the data folder containing contact directories
+        max_workers: Number of worker processes (defaults to the number of CPUs)
+    
+    Returns:
+        Dictionary mapping contact folder names to their style analysis
+    """
+    if not os.path.isdir(data_folder):
+        return {}
+    
+    with os.scandir(data_folder) as entries:
+        contact_names = sorted(
+            entry.name for entry in entries
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, RECENT_INTERACTIONS_FILENAME))
+        )
+    
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        analyses = executor.map(analyze_contact_style, contact_names, repeat(data_folder), chunksize=8)
+        for contact_name, analysis in zip(contact_names, analyses):
+            if analysis is not None:
+                results[contact_name] = analysis
+    
+    return results
+
+
 if __name__ == "__main__":
     # Example usage
     import sys
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == '--all':
+        results = analyze_all_contacts()
+        print(json.dumps(results, indent=2))
+    elif len(sys.argv) > 1:
         contact_name = sys.argv[1]
         result = analyze_contact_style(contact_name)
         
@@ -387,4 +539,4 @@ if __name__ == "__main__":
         else:
             print(f"Could not analyze style for {contact_name}")
     else:
-        print("Usage: python style_analyzer.py 'Contact Name'") 
\ No newline at end of file
+        print("Usage: python style_analyzer.py 'Contact Name' | --all") 
\ No newline at end of file